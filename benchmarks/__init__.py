@@ -0,0 +1,8 @@
+"""
+Synthetic-data benchmarks for the ledger hot paths.
+
+    python -m benchmarks.run --sizes 1000,10000,50000
+
+See benchmarks/run.py for options. Results are written as JSON to
+benchmarks/results/ so runs can be compared across commits.
+"""
@@ -0,0 +1,108 @@
+import random
+from datetime import date, timedelta
+from werkzeug.security import generate_password_hash
+from models import db
+from models.user import User
+from models.category import Category
+from models.expense import Expense
+from models.summary import MonthlySummary
+from models.recurring import RecurringMark
+from models.export import Export
+from models.job import Job
+from utils.summary import rebuild_monthly_summaries
+from utils.recurring import FREQUENCIES
+from utils.category_cache import category_cache
+from utils.accounts import provision_user_categories
+from utils.identity_cache import identity_cache
+from utils.ledger_cache import ledger_cache
+from utils.init import init_db
+
+PASSWORD = 'benchmark'
+
+# Typical spend per transaction, by default category name
+SPEND = {
+    'Food': (5, 60),
+    'Transportation': (2, 40),
+    'Housing': (300, 1500),
+    'Entertainment': (10, 120),
+    'Utilities': (20, 200),
+    'Healthcare': (15, 400),
+    'Education': (20, 500),
+    'Shopping': (10, 300),
+    'Personal': (5, 100),
+    'Other': (1, 200),
+}
+
+WORDS = ['grocery', 'cafe', 'fuel', 'rent', 'cinema', 'power', 'pharmacy', 'course',
+         'online order', 'haircut', 'taxi', 'lunch', 'books', 'gym', 'phone bill']
+
+def user_email(index):
+    return f'bench{index}@example.com'
+
+def reset(app):
+    """Create the schema if needed, delete everything except the default categories and empty the in-process caches"""
+    with app.app_context():
+        init_db()
+        for model in (MonthlySummary, RecurringMark, Export, Job, Expense):
+            model.query.delete(synchronize_session=False)
+        Category.query.filter(Category.user_id.isnot(None)).delete(synchronize_session=False)
+        User.query.delete(synchronize_session=False)
+        db.session.commit()
+    category_cache.clear()
+    identity_cache.clear()
+    ledger_cache.clear()
+
+def generate(app, users=1, transactions=1000, years=3, income_ratio=0.15,
+             recurring_ratio=0.03, seed=42, batch_size=5000):
+    """
+    Load `users` users with `transactions` transactions each.
+    Every user gets a copy of the default categories. Amounts and dates
+    are drawn from a seeded generator, so the same arguments always
+    produce the same ledger. Returns the user ids.
+    """
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(PASSWORD)
+    today = date.today()
+    days = 365 * years
+
+    with app.app_context():
+        user_ids = []
+
+        for index in range(users):
+            user = User(username=f'bench{index}', email=user_email(index), password_hash=password_hash)
+            db.session.add(user)
+            db.session.flush()
+            user_ids.append(user.id)
+
+            provision_user_categories(user.id)
+            categories = Category.query.filter_by(user_id=user.id).all()
+
+            batch = []
+            for _ in range(transactions):
+                category = rng.choice(categories)
+                is_income = rng.random() < income_ratio
+                is_recurring = rng.random() < recurring_ratio
+                if is_income:
+                    amount = rng.uniform(500, 5000)
+                else:
+                    low, high = SPEND.get(category.name, (1, 200))
+                    amount = rng.uniform(low, high)
+                batch.append({
+                    'user_id': user.id,
+                    'category_id': category.id,
+                    'amount': round(amount, 2),
+                    'description': 'salary' if is_income else rng.choice(WORDS),
+                    'date': today - timedelta(days=rng.randrange(days)),
+                    'is_income': is_income,
+                    'is_recurring': is_recurring,
+                    'recurring_frequency': rng.choice(FREQUENCIES[1:3]) if is_recurring else None,
+                })
+                if len(batch) >= batch_size:
+                    db.session.bulk_insert_mappings(Expense, batch)
+                    batch = []
+            if batch:
+                db.session.bulk_insert_mappings(Expense, batch)
+            db.session.commit()
+
+        rebuild_monthly_summaries()
+        return user_ids
@@ -0,0 +1,157 @@
+"""
+Time the ledger hot paths against synthetic data.
+
+    python -m benchmarks.run --sizes 1000,10000,50000 --repeat 5
+    python -m benchmarks.run --database-url mysql://root:pw@localhost/ft_bench
+
+Every size resets the benchmark database (all users and their data; the
+default categories stay), loads --users users with that many
+transactions each, and times each case --repeat times for the first
+user. The first run of a case is reported separately as `cold`, because
+it fills the chart, category and identity caches.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FOLDER = os.path.join(ROOT, 'benchmarks', 'results')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default='sqlite:///' + os.path.join(ROOT, 'benchmarks', 'bench.db'),
+                        help='Database to load (it is wiped for every size)')
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='Comma-separated transactions per user')
+    parser.add_argument('--users', type=int, default=1, help='Users per size')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip', default='', help='Comma-separated case names to leave out')
+    parser.add_argument('--output', default=None, help='JSON results path (default: benchmarks/results/)')
+    return parser.parse_args(argv)
+
+def time_case(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    warm = runs[1:] or runs
+    return {
+        'runs': runs,
+        'cold': runs[0],
+        'median': statistics.median(warm),
+        'min': min(warm),
+        'max': max(warm),
+    }
+
+def _remove(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def build_cases(app, client, user_id):
+    """name -> zero-argument callable; each view call asserts a 200"""
+    from utils.charts import generate_chart_data_for_js, generate_monthly_data_for_js
+    from utils.pdf_export import export_to_pdf
+
+    def in_context(fn):
+        def run():
+            with app.app_context():
+                return fn()
+        return run
+
+    def view(method, url, **kwargs):
+        def run():
+            response = client.open(url, method=method, **kwargs)
+            response.get_data()
+            assert response.status_code == 200, (url, response.status_code)
+        return run
+
+    return {
+        'chart_data_js': in_context(lambda: generate_chart_data_for_js(user_id)),
+        'monthly_data_js': in_context(lambda: generate_monthly_data_for_js(user_id)),
+        'export_pdf': in_context(lambda: _remove(export_to_pdf(user_id, include_charts=True))),
+        'export_csv': view('GET', '/export_all_data'),
+        'view_dashboard': view('GET', '/dashboard'),
+        'api_chart_categories': view('GET', '/api/charts/categories'),
+        'api_chart_trend': view('GET', '/api/charts/trend'),
+        'view_expenses': view('GET', '/expenses'),
+        'view_expenses_search': view('GET', '/expenses?q=pharm'),
+        'view_reports': view('GET', '/reports'),
+        'view_reports_summary': view('POST', '/reports', data={
+            'report_type': 'summary',
+            'export_format': 'none',
+            'include_charts': 'y',
+        }),
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    skip = {name for name in args.skip.split(',') if name}
+
+    # The app reads its configuration at import time
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ['JOB_WORKERS'] = '0'
+    os.environ['EXPORT_SWEEP_INTERVAL'] = '0'
+    sys.path.insert(0, ROOT)
+
+    from app import app
+    from benchmarks import datagen
+
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    results = []
+    for size in sizes:
+        datagen.reset(app)
+        started = time.perf_counter()
+        user_ids = datagen.generate(app, users=args.users, transactions=size, seed=args.seed)
+        load_seconds = time.perf_counter() - started
+        print(f'{size} transactions x {args.users} users loaded in {load_seconds:.2f}s')
+
+        client = app.test_client()
+        response = client.post('/login', data={'email': datagen.user_email(0), 'password': datagen.PASSWORD})
+        assert response.status_code == 302, 'benchmark login failed'
+
+        for name, fn in build_cases(app, client, user_ids[0]).items():
+            if name in skip:
+                continue
+            timing = time_case(fn, args.repeat)
+            results.append(dict(name=name, transactions=size, users=args.users, **timing))
+            print(f"  {name:<22} cold {timing['cold'] * 1000:9.1f} ms   median {timing['median'] * 1000:9.1f} ms")
+
+    report = {
+        'created_at': datetime.utcnow().isoformat() + 'Z',
+        'revision': git_revision(),
+        'database': args.database_url.split('://', 1)[0],
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        output = os.path.join(RESULTS_FOLDER, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {output}')
+
+if __name__ == '__main__':
+    main()
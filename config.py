@@ -17,10 +17,96 @@ class Config:
         f"mysql://{DB_USER}:{quote_plus(DB_PASSWORD)}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Prometheus-format request, SQL, template and render metrics at /metrics,
+    # served only to scrapers sending `Authorization: Bearer <METRICS_TOKEN>`
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+    # Optional read replica: read-only views and export jobs query it, and
+    # users are kept on the primary for READ_YOUR_WRITES_SECONDS after a write
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else None
+    READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS') or 5)
+
+    # Seconds a logged-in user's identity is cached per process (0 disables)
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL') or 30)
+    # Seconds a user's category list is cached per process (0 disables)
+    CATEGORY_CACHE_TTL = int(os.environ.get('CATEGORY_CACHE_TTL') or 300)
+
+    # Connection pool, per process (ignored for SQLite). Keep DB_POOL_RECYCLE
+    # below MySQL's wait_timeout so idle connections are replaced before the
+    # server drops them; pre-ping catches the ones it drops anyway.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 30)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 280)
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1').lower() in ('1', 'true', 'yes')
+    # Serve pool counters as JSON at /internal/pool to requests that send
+    # this token in an X-Pool-Stats-Token header; unset (the default) disables it
+    POOL_STATS_TOKEN = os.environ.get('POOL_STATS_TOKEN') or None
+
+    # Expenses listing: 'keyset' seeks on (date, id), 'offset' uses page numbers
+    EXPENSES_PAGINATION = os.environ.get('EXPENSES_PAGINATION') or 'keyset'
+    EXPENSES_PER_PAGE = 10
+    # Seconds to cache the filtered transaction count (0 hides the total)
+    EXPENSES_COUNT_CACHE_TTL = int(os.environ.get('EXPENSES_COUNT_CACHE_TTL') or 60)
+    # Transactions per lazily loaded page on the reports preview
+    REPORT_PAGE_SIZE = 50
+
+    # Rows fetched per server-side cursor batch when streaming CSV exports
+    CSV_STREAM_CHUNK_SIZE = 1000
+    # Transactions per table in PDF reports; each table is laid out separately
+    PDF_TABLE_CHUNK_ROWS = int(os.environ.get('PDF_TABLE_CHUNK_ROWS') or 200)
+
+    # Background job process pool size (0 runs jobs inline in the request)
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 2)
+
+    # Threads rendering matplotlib charts per process
+    CHART_RENDER_WORKERS = int(os.environ.get('CHART_RENDER_WORKERS') or 2)
+
+    # Content-addressed chart image cache (defaults to static/temp/charts)
+    CHART_CACHE_FOLDER = os.environ.get('CHART_CACHE_FOLDER')
+    CHART_CACHE_MAX_FILES = int(os.environ.get('CHART_CACHE_MAX_FILES') or 500)
+    CHART_CACHE_MAX_BYTES = int(os.environ.get('CHART_CACHE_MAX_BYTES') or 50 * 1024 * 1024)
+
+    # Rows per INSERT batch (and transaction) when importing statements
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE') or 5000)
+
+    # Rows per DELETE batch (and transaction) when a closed account's data is removed
+    ACCOUNT_DELETION_BATCH_SIZE = int(os.environ.get('ACCOUNT_DELETION_BATCH_SIZE') or 1000)
+
+    # Opt-in per-process NumPy ledger cache for report aggregations
+    LEDGER_CACHE_ENABLED = os.environ.get('LEDGER_CACHE_ENABLED', '').lower() in ('1', 'true', 'yes')
+    LEDGER_CACHE_MAX_BYTES = int(os.environ.get('LEDGER_CACHE_MAX_BYTES') or 64 * 1024 * 1024)
     EXPORT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exports')
     CSV_FOLDER = os.path.join(EXPORT_FOLDER, 'csv')
     PDF_FOLDER = os.path.join(EXPORT_FOLDER, 'pdf')
     
+    # Export retention: age and per-user size limits, enforced every
+    # EXPORT_SWEEP_INTERVAL seconds by a background sweeper (0 disables it)
+    EXPORT_RETENTION_DAYS = int(os.environ.get('EXPORT_RETENTION_DAYS') or 30)
+    EXPORT_QUOTA_BYTES_PER_USER = int(os.environ.get('EXPORT_QUOTA_BYTES_PER_USER') or 100 * 1024 * 1024)
+    EXPORT_SWEEP_INTERVAL = int(os.environ.get('EXPORT_SWEEP_INTERVAL') or 3600)
+    
     # Create export directories if they don't exist
     os.makedirs(CSV_FOLDER, exist_ok=True)
     os.makedirs(PDF_FOLDER, exist_ok=True)
+
+class DevelopmentConfig(Config):
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 2)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 3)
+
+class ProductionConfig(Config):
+    # Sized for a handful of threads per worker; multiply by the worker
+    # count to get the connections each app server needs from MySQL
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 10)
+
+# Selected with the FLASK_CONFIG environment variable
+config = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'default': Config,
+}
@@ -1,8 +1,9 @@
 
 
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import StringField, FloatField, SelectField, BooleanField, DateField, SubmitField
-from wtforms.validators import DataRequired, Optional
+from wtforms.validators import DataRequired, Optional, Length
 
 
 class ExpenseForm(FlaskForm):
@@ -29,6 +30,7 @@ class ExpenseForm(FlaskForm):
 
 
 class FilterForm(FlaskForm):
+    q = StringField('Search', validators=[Optional(), Length(max=100)])
     start_date = DateField('Start Date', validators=[Optional()])
     end_date = DateField('End Date', validators=[Optional()])
 
@@ -45,4 +47,22 @@ class QuickExpenseForm(FlaskForm):
     description = StringField('Description', validators=[Optional()])
     category = SelectField('Category', coerce=int, validators=[DataRequired()])
     is_income = BooleanField('Income')
-    submit = SubmitField('Add')
\ No newline at end of file
+    submit = SubmitField('Add')
+
+
+class ImportForm(FlaskForm):
+    file = FileField('Statement', validators=[
+        FileRequired(),
+        FileAllowed(['csv', 'ofx', 'qfx'], 'CSV or OFX statements only.')
+    ])
+    file_format = SelectField(
+        'Format',
+        choices=[
+            ('auto', 'Detect from file name'),
+            ('csv', 'CSV'),
+            ('ofx', 'OFX / QFX')
+        ],
+        default='auto'
+    )
+    date_format = StringField('Date Format', validators=[Optional()])
+    submit = SubmitField('Import')
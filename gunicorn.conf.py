@@ -0,0 +1,21 @@
+# gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.environ.get('GUNICORN_BIND') or '0.0.0.0:8000'
+workers = int(os.environ.get('GUNICORN_WORKERS') or 4)
+threads = int(os.environ.get('GUNICORN_THREADS') or 4)
+
+# Load the app once in the master and fork workers from it
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1').lower() in ('1', 'true', 'yes')
+
+# Also import matplotlib, NumPy and reportlab in the master before forking,
+# so workers share them instead of loading them on their first report
+warm_up_reports = os.environ.get('GUNICORN_WARM_UP', '').lower() in ('1', 'true', 'yes')
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any worker is forked
+    if preload_app and warm_up_reports:
+        from utils.init import warm_up
+
+        warm_up()
+        server.log.info('Report stack loaded before fork')
@@ -1,3 +1,30 @@
-from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import orm
 
-db = SQLAlchemy()
+REPLICA_BIND = 'replica'
+
+class RoutingSession(SignallingSession):
+    """
+    Session that sends reads to the 'replica' bind while
+    `info['use_replica']` is set (see utils.db_routing.read_only).
+    Flushes and DML statements always go to the primary, and once the
+    session has written anything it stays on the primary, so it never
+    reads back older data than it just wrote.
+    """
+    def __init__(self, db, **options):
+        self._db = db
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None):
+        if self.info.get('use_replica'):
+            if self._flushing or getattr(clause, 'is_dml', False):
+                self.info['use_replica'] = False
+            elif REPLICA_BIND in (self.app.config.get('SQLALCHEMY_BINDS') or {}):
+                return self._db.get_engine(self.app, bind=REPLICA_BIND)
+        return super().get_bind(mapper, clause)
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+db = RoutingSQLAlchemy()
@@ -3,6 +3,11 @@ from models import db
 
 class Expense(db.Model):
     __tablename__ = 'expenses'
+    __table_args__ = (
+        # Every hot query filters by user first, then by date, type or category
+        db.Index('ix_expenses_user_date', 'user_id', 'date'),
+        db.Index('ix_expenses_user_type_category_date', 'user_id', 'is_income', 'category_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Float, nullable=False)
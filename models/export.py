@@ -0,0 +1,21 @@
+from datetime import datetime
+from models import db
+
+class Export(db.Model):
+    """Manifest entry for an export file written to CSV_FOLDER or PDF_FOLDER"""
+    __tablename__ = 'exports'
+    __table_args__ = (
+        db.Index('ix_exports_user_created', 'user_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_type = db.Column(db.String(8), nullable=False)  # 'csv' or 'pdf'
+    filename = db.Column(db.String(255), nullable=False, unique=True)
+    size = db.Column(db.Integer, default=0)  # Bytes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    # Foreign keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<Export {self.filename}>'
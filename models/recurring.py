@@ -0,0 +1,14 @@
+from datetime import datetime
+from models import db
+
+class RecurringMark(db.Model):
+    """High-water mark of materialized occurrences for one recurring template"""
+    __tablename__ = 'recurring_marks'
+
+    template_id = db.Column(db.Integer, db.ForeignKey('expenses.id'), primary_key=True)
+    occurrences = db.Column(db.Integer, nullable=False, default=0)  # Occurrences generated so far
+    next_date = db.Column(db.Date, nullable=False, index=True)  # Date of the next occurrence due
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RecurringMark {self.template_id} next={self.next_date}>'
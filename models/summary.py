@@ -0,0 +1,30 @@
+from datetime import datetime
+from models import db
+
+# category_id of the rollup rows for transactions without a category
+UNCATEGORIZED = 0
+
+class MonthlySummary(db.Model):
+    """Pre-aggregated per-user totals for one calendar month and category"""
+    __tablename__ = 'monthly_summaries'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'month', 'category_id', name='uq_monthly_summary'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Date, nullable=False)  # First day of the month
+    income_total = db.Column(db.Float, nullable=False, default=0)
+    expense_total = db.Column(db.Float, nullable=False, default=0)
+    income_count = db.Column(db.Integer, nullable=False, default=0)
+    expense_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Uncategorized transactions are stored under UNCATEGORIZED rather than
+    # NULL, so uq_monthly_summary covers them too. Not a foreign key, since
+    # 0 isn't a category.
+    category_id = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<MonthlySummary {self.user_id} {self.month:%Y-%m}>'
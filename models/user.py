@@ -3,6 +3,10 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from models import db
 
+# Stored in place of a password hash once an account is closed. It isn't a
+# valid werkzeug hash, so check_password always fails.
+CLOSED_PASSWORD_HASH = '!closed'
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
     
@@ -12,6 +16,8 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(300))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
+    # Bumped with every change to the user's rollup; part of ledger_stamp()
+    ledger_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     
     # Relationships
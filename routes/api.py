@@ -0,0 +1,87 @@
+import json
+import hashlib
+from datetime import date, datetime
+from flask import Blueprint, Response, request, abort
+from flask_login import login_required, current_user
+from werkzeug.http import is_resource_modified
+from utils.charts import generate_chart_data_for_js, generate_monthly_data_for_js
+from utils.ledger_cache import ledger_stamp
+from utils.db_routing import read_only
+from utils.timeseries import GRANULARITIES, MAX_POINTS, recent_range
+
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+def _chart_response(kind, build, *validators):
+    """
+    JSON chart data with an ETag and Last-Modified taken from the user's
+    monthly rollup. Every ledger write updates the rollup, so an unchanged
+    stamp means the chart is unchanged and we answer 304 without running
+    the aggregation at all.
+    """
+    stamp = ledger_stamp(current_user.id)
+    last_modified = stamp[0]
+    payload = json.dumps([kind, current_user.id, stamp, validators], default=str)
+    etag = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        response = Response(build(current_user.id), mimetype='application/json')
+
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # Cache in the browser, but revalidate on every load
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@api_bp.route('/charts/categories')
+@login_required
+@read_only
+def category_chart():
+    """Expense totals per category for the dashboard pie chart"""
+    return _chart_response('categories', generate_chart_data_for_js)
+
+def _date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        abort(400, f'{name} must be YYYY-MM-DD')
+
+@api_bp.route('/charts/trend')
+@login_required
+@read_only
+def trend_chart():
+    """
+    Income and expenses per period for the trend charts.
+    ?granularity=day|week|month|quarter|year picks the bucket size and
+    ?periods=N the number of buckets up to today (default: 6 months).
+    ?start=YYYY-MM-DD and ?end=YYYY-MM-DD ask for an explicit range instead;
+    without a granularity it is bucketed to fit about 60 points.
+    """
+    granularity = request.args.get('granularity') or None
+    if granularity is not None and granularity not in GRANULARITIES:
+        abort(400, f"granularity must be one of {', '.join(GRANULARITIES)}")
+    start_date, end_date = _date_arg('start'), _date_arg('end')
+
+    if start_date is None and end_date is None:
+        periods = request.args.get('periods', 6, type=int)
+        if not 1 <= periods <= MAX_POINTS:
+            abort(400, f'periods must be between 1 and {MAX_POINTS}')
+        start_date, end_date = recent_range(granularity or 'month', periods)
+        granularity = granularity or 'month'
+
+    def build(user_id):
+        try:
+            return generate_monthly_data_for_js(user_id, start_date=start_date, end_date=end_date,
+                                                granularity=granularity)
+        except ValueError as e:
+            abort(400, str(e))
+
+    # Open-ended ranges are relative to today, so the same rollup means a
+    # different chart once the day rolls over
+    return _chart_response('trend', build, granularity, start_date, end_date, date.today())
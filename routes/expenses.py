@@ -0,0 +1,242 @@
+from datetime import datetime
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, jsonify
+from flask_login import login_required, current_user
+from models import db
+from models.expense import Expense
+from models.recurring import RecurringMark
+from forms.expense_forms import ExpenseForm, FilterForm, ImportForm
+from utils.summary import add_to_summary, remove_from_summary, summary_count
+from utils.pagination import keyset_paginate, cached_count
+from utils.importer import PARSERS, detect_format, import_transactions
+from utils.db_routing import read_only
+from utils.search import apply_search
+from utils.recurring import reanchor_mark
+from utils.category_cache import category_choices, get_user_categories
+
+expenses_bp = Blueprint('expenses', __name__)
+
+@expenses_bp.route('/expenses', methods=['GET', 'POST'])
+@login_required
+def expenses():
+    # ===== Expense Form =====
+    form = ExpenseForm()
+    categories = get_user_categories(current_user.id)
+    form.category.choices = [(c.id, c.name) for c in categories]
+
+    # ===== Filter Form =====
+    # Filters travel in the query string so pagination links keep them
+    filter_form = FilterForm(request.args, meta={'csrf': False})
+    filter_form.category.choices = [(0, 'All Categories')] + [
+        (c.id, c.name) for c in categories
+    ]
+
+    # ===== Handle Add Expense =====
+    if form.validate_on_submit():
+        expense = Expense(
+            amount=form.amount.data,
+            description=form.description.data,
+            date=form.date.data,
+            is_income=form.is_income.data,
+            is_recurring=form.is_recurring.data,
+            recurring_frequency=form.recurring_frequency.data
+            if form.is_recurring.data else None,
+            category_id=form.category.data,
+            user_id=current_user.id
+        )
+
+        db.session.add(expense)
+        add_to_summary(expense)
+        db.session.commit()
+        flash('Transaction added successfully!', 'success')
+        return redirect(url_for('expenses.expenses'))
+
+    # ===== Query Builder =====
+    query = Expense.query.filter_by(user_id=current_user.id)
+
+    # Filters (GET)
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    category_id = request.args.get('category', type=int)
+    search = request.args.get('q', '').strip()[:100]
+
+    if start_date:
+        query = query.filter(Expense.date >= start_date)
+
+    if end_date:
+        query = query.filter(Expense.date <= end_date)
+
+    if category_id and category_id != 0:
+        query = query.filter_by(category_id=category_id)
+
+    # Matched against the description text index, not a LIKE scan
+    if search:
+        query = apply_search(query, search, current_user.id)
+
+    per_page = current_app.config['EXPENSES_PER_PAGE']
+
+    if current_app.config['EXPENSES_PAGINATION'] == 'offset':
+        page = request.args.get('page', 1, type=int)
+        transactions = query.order_by(
+            Expense.date.desc()
+        ).paginate(page=page, per_page=per_page)
+    else:
+        # Total count: exact from the rollup when unfiltered by date,
+        # otherwise a short-lived cached COUNT(*)
+        total = None
+        count_ttl = current_app.config['EXPENSES_COUNT_CACHE_TTL']
+        if count_ttl:
+            if not start_date and not end_date and not search:
+                total = summary_count(current_user.id, category_id)
+            else:
+                key = (current_user.id, start_date, end_date, category_id, search)
+                total = cached_count(key, query, ttl=count_ttl)
+
+        transactions = keyset_paginate(
+            query,
+            after=request.args.get('after'),
+            before=request.args.get('before'),
+            per_page=per_page,
+            total=total
+        )
+
+    return render_template(
+        'expenses.html',
+        form=form,
+        filter_form=filter_form,
+        transactions=transactions,
+        categories=categories,
+        category_names={c.id: c.name for c in categories}
+    )
+
+@expenses_bp.route('/expenses/add', methods=['POST'])
+@login_required
+def add_expense():
+    """Quick add expense from dashboard"""
+    from forms.expense_forms import QuickExpenseForm
+    form = QuickExpenseForm()
+    form.category.choices = category_choices(current_user.id)
+    
+    if form.validate_on_submit():
+        expense = Expense(
+            amount=form.amount.data,
+            description=form.description.data,
+            date=datetime.utcnow().date(),
+            is_income=form.is_income.data,
+            category_id=form.category.data,
+            user_id=current_user.id
+        )
+        
+        db.session.add(expense)
+        add_to_summary(expense)
+        db.session.commit()
+        
+        flash('Transaction added successfully!', 'success')
+    else:
+        for field, errors in form.errors.items():
+            for error in errors:
+                flash(f"{field}: {error}", 'danger')
+    
+    return redirect(url_for('main.dashboard'))
+
+@expenses_bp.route('/expenses/import', methods=['GET', 'POST'])
+@login_required
+def import_expenses():
+    """Bulk import transactions from a bank CSV or OFX statement"""
+    form = ImportForm()
+
+    if form.validate_on_submit():
+        upload = form.file.data
+        file_format = form.file_format.data
+        if file_format == 'auto':
+            file_format = detect_format(upload.filename)
+
+        try:
+            if file_format == 'csv':
+                records = PARSERS['csv'](upload.stream, date_format=form.date_format.data or None)
+            else:
+                records = PARSERS['ofx'](upload.stream)
+            stats = import_transactions(
+                current_user.id,
+                records,
+                batch_size=current_app.config['IMPORT_BATCH_SIZE']
+            )
+        except ValueError as e:
+            db.session.rollback()
+            flash(f'Import failed: {e}', 'danger')
+            return render_template('import.html', form=form)
+
+        flash(
+            f"Imported {stats['rows']} transactions in {stats['seconds']:.1f}s"
+            f" ({stats['skipped']} rows skipped).",
+            'success'
+        )
+        return redirect(url_for('expenses.expenses'))
+
+    return render_template('import.html', form=form)
+
+@expenses_bp.route('/expenses/get/<int:id>')
+@login_required
+@read_only
+def get_expense(id):
+    """Get expense data for editing"""
+    expense = Expense.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+    
+    return jsonify({
+        'id': expense.id,
+        'amount': expense.amount,
+        'description': expense.description,
+        'date': expense.date.strftime('%Y-%m-%d'),
+        'category_id': expense.category_id,
+        'is_income': expense.is_income,
+        'is_recurring': expense.is_recurring,
+        'recurring_frequency': expense.recurring_frequency
+    })
+
+@expenses_bp.route('/expenses/edit/<int:id>', methods=['POST'])
+@login_required
+def edit_expense(id):
+    expense = Expense.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+
+    form = ExpenseForm()
+    form.category.choices = category_choices(current_user.id)
+    # The edit modal doesn't carry the recurring fields; they aren't edited here
+    del form.is_recurring
+    del form.recurring_frequency
+
+    if not form.validate_on_submit():
+        for field, errors in form.errors.items():
+            for error in errors:
+                flash(f"{field}: {error}", 'danger')
+        return redirect(url_for('expenses.expenses'))
+
+    # Move the old values out of the rollup before applying the edit
+    remove_from_summary(expense)
+
+    old_date = expense.date
+    expense.amount = form.amount.data
+    expense.description = form.description.data
+    expense.date = form.date.data
+    expense.category_id = form.category.data
+    expense.is_income = form.is_income.data
+
+    add_to_summary(expense)
+    # A recurring template's schedule follows its date
+    if expense.is_recurring and expense.date != old_date:
+        reanchor_mark(expense, old_date)
+    db.session.commit()
+    flash('Transaction updated!', 'success')
+    return redirect(url_for('expenses.expenses'))
+
+@expenses_bp.route('/expenses/delete/<int:id>')
+@login_required
+def delete_expense(id):
+    """Delete an expense"""
+    expense = Expense.query.filter_by(id=id, user_id=current_user.id).first_or_404()
+    
+    remove_from_summary(expense)
+    RecurringMark.query.filter_by(template_id=expense.id).delete()
+    db.session.delete(expense)
+    db.session.commit()
+    
+    flash('Transaction deleted successfully!', 'success')
+    return redirect(url_for('expenses.expenses'))
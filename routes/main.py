@@ -0,0 +1,193 @@
+import hmac
+from datetime import datetime
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, jsonify, abort
+from flask_login import logout_user, login_required, current_user
+from models import db
+from models.user import User
+from models.expense import Expense
+from forms.profile_forms import ProfileForm, PasswordForm
+from utils.export import csv_download_response
+from utils.accounts import close_account
+from utils.jobs import submit_job
+from utils.summary import add_to_summary, summary_totals
+from utils.db_pool import pool_stats
+from utils.db_routing import read_only
+from utils.identity_cache import identity_cache
+from utils.category_cache import category_choices
+
+main_bp = Blueprint('main', __name__)
+
+@main_bp.route('/')
+def index():
+    """Landing page"""
+    if current_user.is_authenticated:
+        return redirect(url_for('main.dashboard'))
+    return render_template('index.html')
+
+@main_bp.route('/dashboard')
+@login_required
+@read_only
+def dashboard():
+    """User dashboard"""
+    # Get quick add form
+    from forms.expense_forms import QuickExpenseForm
+    quick_form = QuickExpenseForm()
+    quick_form.category.choices = category_choices(current_user.id)
+    
+    # Get financial summary from the monthly rollup
+    total_income, total_expenses = summary_totals(current_user.id)
+    
+    # Get recent transactions
+    recent_transactions = Expense.query.filter_by(
+        user_id=current_user.id
+    ).order_by(Expense.date.desc()).limit(5).all()
+    
+    # Chart data is fetched separately from /api/charts/*
+    return render_template(
+        'dashboard.html',
+        quick_form=quick_form,
+        total_income=total_income,
+        total_expenses=total_expenses,
+        recent_transactions=recent_transactions
+    )
+
+@main_bp.route('/profile', methods=['GET', 'POST'])
+@login_required
+def profile():
+    """User profile page"""
+    # current_user is a cached snapshot; edits go through the real row
+    user = User.query.get_or_404(current_user.id)
+    profile_form = ProfileForm(obj=user)
+    password_form = PasswordForm()
+    
+    if request.method == 'POST':
+        if 'update_profile' in request.form and profile_form.validate_on_submit():
+            # Check if email is already taken by another user
+            if profile_form.email.data != user.email:
+                existing_user = User.query.filter_by(email=profile_form.email.data).first()
+                if existing_user:
+                    flash('Email already in use by another account.', 'danger')
+                    return redirect(url_for('main.profile'))
+            
+            # Check if username is already taken by another user
+            if profile_form.username.data != user.username:
+                existing_user = User.query.filter_by(username=profile_form.username.data).first()
+                if existing_user:
+                    flash('Username already in use by another account.', 'danger')
+                    return redirect(url_for('main.profile'))
+            
+            # Update user profile
+            user.username = profile_form.username.data
+            user.email = profile_form.email.data
+            db.session.commit()
+            identity_cache.invalidate(user.id)
+            
+            flash('Profile updated successfully!', 'success')
+            return redirect(url_for('main.profile'))
+        
+        elif 'update_password' in request.form and password_form.validate_on_submit():
+            # Verify current password
+            if not user.check_password(password_form.current_password.data):
+                flash('Current password is incorrect.', 'danger')
+                return redirect(url_for('main.profile'))
+            
+            # Update password
+            user.set_password(password_form.new_password.data)
+            db.session.commit()
+            identity_cache.invalidate(user.id)
+            
+            flash('Password updated successfully!', 'success')
+            return redirect(url_for('main.profile'))
+    
+    return render_template(
+        'profile.html',
+        profile_form=profile_form,
+        password_form=password_form
+    )
+
+@main_bp.route('/export_all_data')
+@login_required
+def export_all_data():
+    """Export all user data to CSV"""
+    return csv_download_response(current_user.id)
+
+@main_bp.route('/delete_account', methods=['POST'])
+@login_required
+def delete_account():
+    """Delete user account and all associated data"""
+    confirmation = request.form.get('confirmation')
+    
+    if confirmation != 'DELETE':
+        flash('Account deletion canceled. Confirmation text did not match.', 'warning')
+        return redirect(url_for('main.profile'))
+    
+    # Lock the account out now; its data is deleted in batches by a background job
+    user = User.query.get_or_404(current_user.id)
+    close_account(user)
+    db.session.commit()
+    logout_user()
+    submit_job(user.id, 'account_deletion', account_id=user.id)
+    
+    flash('Your account has been closed. Your data is being permanently deleted.', 'info')
+    return redirect(url_for('main.index'))
+
+@main_bp.route('/quick_add', methods=['POST'])
+@login_required
+def quick_add():
+    """Quick add expense from dashboard"""
+    from forms.expense_forms import QuickExpenseForm
+    
+    form = QuickExpenseForm()
+    form.category.choices = category_choices(current_user.id)
+    
+    if form.validate_on_submit():
+        expense = Expense(
+            amount=form.amount.data,
+            description=form.description.data,
+            date=datetime.utcnow().date(),
+            is_income=form.is_income.data,
+            category_id=form.category.data,
+            user_id=current_user.id
+        )
+        
+        db.session.add(expense)
+        add_to_summary(expense)
+        db.session.commit()
+        flash('Transaction added successfully!', 'success')
+    else:
+        for field, errors in form.errors.items():
+            for error in errors:
+                flash(f"{field}: {error}", 'danger')
+    
+    return redirect(url_for('main.dashboard'))
+
+@main_bp.route('/internal/pool')
+def pool_status():
+    """Connection pool counters for this worker process, for callers holding POOL_STATS_TOKEN"""
+    token = current_app.config.get('POOL_STATS_TOKEN')
+    supplied = request.headers.get('X-Pool-Stats-Token', '')
+    if not token or not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+        abort(404)
+    return jsonify(pool_stats(db.engine))
+
+@main_bp.app_template_filter('format_currency')
+def format_currency(value):
+    """Format a number as currency"""
+    return f"{value:,.2f}"
+
+@main_bp.app_errorhandler(404)
+def page_not_found(e):
+    """Handle 404 errors"""
+    return render_template('404.html'), 404
+    return render_template('errors/404.html'), 404
+
+@main_bp.app_errorhandler(500)
+def internal_server_error(e):
+    """Handle 500 errors"""
+    return render_template('500.html'), 500
+    return render_template('errors/500.html'), 500
+
+@main_bp.app_context_processor
+def inject_now():
+    """Inject current date into templates"""
+    return {'now': datetime.utcnow()}
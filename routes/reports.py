@@ -0,0 +1,245 @@
+import os
+from datetime import datetime
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, jsonify, abort
+from flask import send_from_directory, send_file
+from flask_login import login_required, current_user
+from models import db
+from models.expense import Expense
+from models.job import Job
+from forms.report_forms import ReportForm
+from utils.charts import (
+    submit_expense_pie_chart,
+    submit_monthly_trend_chart,
+    get_chart_cache_folder,
+    chart_cache_filename,
+    CHART_FORMATS
+)
+from utils.export import csv_download_response, get_recent_exports
+from utils.pagination import keyset_paginate
+from utils.jobs import submit_job
+from utils.ledger_cache import get_ledger
+from utils.db_routing import read_only, primary_until
+from utils.category_cache import category_choices, get_user_categories
+
+reports_bp = Blueprint('reports', __name__)
+
+def _filter_report_query(query, start_date=None, end_date=None, category_ids=None):
+    """Apply the report form's date range and category filters to an Expense query"""
+    if start_date:
+        query = query.filter(Expense.date >= start_date)
+    if end_date:
+        query = query.filter(Expense.date <= end_date)
+    if category_ids:
+        query = query.filter(Expense.category_id.in_(category_ids))
+    return query
+
+@reports_bp.route('/reports', methods=['GET', 'POST'])
+@login_required
+@read_only
+def reports():
+    form = ReportForm()
+    form.categories.choices = category_choices(current_user.id)
+
+    report_data = None
+    export_job = None
+
+    if form.validate_on_submit():
+        # CSV streams straight back; nothing else on the page is needed
+        if form.export_format.data == 'csv':
+            return csv_download_response(
+                current_user.id,
+                start_date=form.start_date.data,
+                end_date=form.end_date.data,
+                category_ids=form.categories.data
+            )
+
+        ledger = get_ledger(current_user.id)
+        if ledger is not None:
+            total_income, total_expenses = ledger.totals(
+                form.start_date.data, form.end_date.data, form.categories.data
+            )
+            transaction_count = int(ledger.mask(
+                form.start_date.data, form.end_date.data, form.categories.data
+            ).sum())
+        else:
+            # One conditional aggregate instead of loading every row
+            query = _filter_report_query(
+                db.session.query(
+                    db.func.sum(db.case((Expense.is_income == True, Expense.amount), else_=0)),
+                    db.func.sum(db.case((Expense.is_income == False, Expense.amount), else_=0)),
+                    db.func.count(Expense.id)
+                ).filter(Expense.user_id == current_user.id),
+                form.start_date.data,
+                form.end_date.data,
+                form.categories.data
+            )
+            total_income, total_expenses, transaction_count = query.one()
+            total_income = total_income or 0
+            total_expenses = total_expenses or 0
+
+        charts = []
+        if form.include_charts.data:
+            # Served from the content-addressed chart cache; unchanged data isn't re-rendered
+            pie = submit_expense_pie_chart(current_user.id)
+            # The trend follows the report's range, bucketed to suit its length
+            trend = submit_monthly_trend_chart(
+                current_user.id, start_date=form.start_date.data, end_date=form.end_date.data
+            )
+
+            for chart in (pie, trend):
+                if chart:
+                    chart.result()
+                    charts.append(chart.url)
+
+        report_data = {
+            'start_date': form.start_date.data,
+            'end_date': form.end_date.data,
+            'total_income': total_income,
+            'total_expenses': total_expenses,
+            'transaction_count': transaction_count,
+            'transactions_url': url_for(
+                'reports.report_transactions',
+                start_date=form.start_date.data,
+                end_date=form.end_date.data,
+                categories=form.categories.data
+            ),
+            'charts': charts
+        }
+
+        # ✅ EXPORT + AUTO DOWNLOAD
+        if form.export_format.data == 'pdf':
+            # Rendered in the background; the page polls the job for progress
+            # Captured before submit_job commits, since that commit pins too
+            export_job = submit_job(
+                current_user.id,
+                'pdf_export',
+                primary_until=primary_until(),
+                start_date=form.start_date.data,
+                end_date=form.end_date.data,
+                include_charts=form.include_charts.data
+            )
+
+    # ===============================
+    # RECENT EXPORTS
+    # ===============================
+    # Read from the export manifest, so page load doesn't depend on folder size
+    recent_exports = [
+        {
+            'filename': export.filename,
+            'type': export.file_type.upper(),
+            'date': export.created_at
+        }
+        for export in get_recent_exports(current_user.id)
+    ]
+
+    return render_template(
+        'reports.html',
+        form=form,
+        report_data=report_data,
+        export_job=export_job,
+        recent_exports=recent_exports
+    )
+
+@reports_bp.route('/reports/transactions')
+@login_required
+@read_only
+def report_transactions():
+    """One page of a report's transaction list, as an HTML fragment"""
+    def parse_date(name):
+        value = request.args.get(name)
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+        except ValueError:
+            abort(400)
+
+    start_date = parse_date('start_date')
+    end_date = parse_date('end_date')
+    category_ids = request.args.getlist('categories', type=int)
+
+    query = _filter_report_query(
+        Expense.query.filter_by(user_id=current_user.id),
+        start_date,
+        end_date,
+        category_ids
+    )
+    page = keyset_paginate(query, after=request.args.get('after'), per_page=current_app.config['REPORT_PAGE_SIZE'])
+
+    next_url = None
+    if page.has_next:
+        next_url = url_for(
+            'reports.report_transactions',
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            categories=category_ids,
+            after=page.next_cursor
+        )
+    return render_template(
+        'report_transactions.html',
+        transactions=page.items,
+        category_names={c.id: c.name for c in get_user_categories(current_user.id)},
+        next_url=next_url
+    )
+
+def _job_status(job):
+    status = job.to_dict()
+    status['status_url'] = url_for('reports.job_status', job_id=job.id)
+    if job.status == 'done':
+        status['download_url'] = url_for('reports.job_download', job_id=job.id)
+    return status
+
+@reports_bp.route('/reports/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    """Poll a background job's progress"""
+    job = Job.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
+    return jsonify(_job_status(job))
+
+@reports_bp.route('/reports/jobs/<job_id>/download')
+@login_required
+def job_download(job_id):
+    """Download the file produced by a finished job"""
+    job = Job.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
+    if job.status != 'done' or not job.result_path or not os.path.exists(job.result_path):
+        abort(404)
+    return send_file(job.result_path, as_attachment=True)
+
+@reports_bp.route('/charts/<key>.<fmt>')
+@login_required
+def chart_image(key, fmt):
+    """Serve one of the current user's cached chart images; the content hash doubles as its ETag"""
+    if fmt not in CHART_FORMATS or len(key) != 64 or not all(c in '0123456789abcdef' for c in key):
+        abort(404)
+
+    # Files are named by owner, so another user's key is simply not found
+    response = send_from_directory(
+        get_chart_cache_folder(),
+        chart_cache_filename(current_user.id, key, fmt),
+        mimetype=CHART_FORMATS[fmt],
+        etag=key,
+        max_age=3600
+    )
+    # Financial data: browsers may cache it, shared caches may not
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+@reports_bp.route('/download/<file_type>/<filename>')
+@login_required
+def download_file(file_type, filename):
+    """Download an exported file"""
+    # Security check: ensure filename belongs to current user
+    if not filename.startswith(f'user_{current_user.id}_'):
+        flash('Access denied.', 'danger')
+        return redirect(url_for('reports.reports'))
+    
+    # Determine the correct directory
+    if file_type.lower() == 'csv':
+        directory = current_app.config['CSV_FOLDER']
+    elif file_type.lower() == 'pdf':
+        directory = current_app.config['PDF_FOLDER']
+    else:
+        flash('Invalid file type.', 'danger')
+        return redirect(url_for('reports.reports'))
+    
+    # Provide the file for download
+    return send_from_directory(directory, filename, as_attachment=True)
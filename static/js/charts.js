@@ -32,6 +32,14 @@ class FinanceCharts {
             'rgba(40, 167, 69, 1)',
             'rgba(220, 53, 69, 1)'
         ];
+        
+        this.periodTitles = {
+            day: 'Daily',
+            week: 'Weekly',
+            month: 'Monthly',
+            quarter: 'Quarterly',
+            year: 'Yearly'
+        };
     }
     
     /**
@@ -129,7 +137,7 @@ class FinanceCharts {
                     },
                     title: {
                         display: true,
-                        text: 'Monthly Income vs Expenses',
+                        text: `${this.periodTitles[data.granularity] || 'Monthly'} Income vs Expenses`,
                         font: {
                             size: 16
                         }
@@ -206,6 +214,66 @@ class FinanceCharts {
             }
         });
     }
+    
+    /**
+     * Fetch JSON chart data. The API sends an ETag and `Cache-Control: no-cache`,
+     * so repeat loads are revalidated and answered with 304 from the browser cache.
+     * @param {string} url - Chart data endpoint
+     */
+    fetchChartData(url) {
+        return fetch(url, { credentials: 'same-origin' }).then(function(response) {
+            if (!response.ok) {
+                throw new Error(`${url} returned ${response.status}`);
+            }
+            return response.json();
+        });
+    }
+    
+    /**
+     * Fetch the dashboard charts in parallel and draw them as they arrive
+     * @param {Object} charts - { elementId: [url, createMethodName], ... }
+     */
+    loadCharts(charts) {
+        return Promise.all(Object.entries(charts).map(([elementId, [url, create]]) => {
+            return this.fetchChartData(url).then(data => {
+                if (!data.labels || !data.labels.length) {
+                    this.showEmpty(elementId);
+                    return null;
+                }
+                this.showEmpty(elementId, null);
+                return this[create](elementId, data);
+            }).catch(error => {
+                console.error(error);
+                this.showEmpty(elementId, 'Chart data could not be loaded.');
+                return null;
+            });
+        }));
+    }
+    
+    /**
+     * Clear a chart canvas and show a short message in its place, or with
+     * message === null restore the canvas for a new chart
+     * @param {string} elementId - The ID of the canvas element
+     * @param {?string} message - Text to show
+     */
+    showEmpty(elementId, message = 'No data yet.') {
+        const canvas = document.getElementById(elementId);
+        const existing = Chart.getChart(canvas);
+        if (existing) {
+            existing.destroy();
+        }
+        
+        let note = document.getElementById(`${elementId}-note`);
+        if (!note) {
+            note = document.createElement('p');
+            note.id = `${elementId}-note`;
+            note.className = 'text-muted';
+            canvas.parentNode.insertBefore(note, canvas);
+        }
+        note.textContent = message || '';
+        note.hidden = message === null;
+        canvas.hidden = message !== null;
+    }
 }
 
 // Initialize charts when document is ready
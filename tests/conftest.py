@@ -0,0 +1,53 @@
+import pytest
+from config import Config
+from models import db
+from utils.init import create_app, init_db
+
+class TestConfig(Config):
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    METRICS_ENABLED = False
+    JOB_WORKERS = 0
+    LEDGER_CACHE_ENABLED = False
+    EXPENSES_COUNT_CACHE_TTL = 0
+
+@pytest.fixture
+def app(tmp_path):
+    """An app on a fresh SQLite database with the default categories"""
+    app = create_app(TestConfig)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'finance.db'}",
+        CSV_FOLDER=str(tmp_path / 'csv'),
+        PDF_FOLDER=str(tmp_path / 'pdf'),
+        CHART_CACHE_FOLDER=str(tmp_path / 'charts'),
+    )
+    with app.app_context():
+        init_db()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    """A test client logged in as a newly registered user"""
+    client = app.test_client()
+    client.post('/register', data={
+        'username': 'alice',
+        'email': 'alice@example.com',
+        'password': 'password1',
+        'password2': 'password1',
+        'accept_tos': 'y',
+    })
+    response = client.post('/login', data={'email': 'alice@example.com', 'password': 'password1'})
+    assert response.status_code == 302
+    return client
+
+@pytest.fixture
+def user_id(client):
+    from models.user import User
+    return User.query.filter_by(username='alice').one().id
+
+@pytest.fixture
+def category_ids(user_id):
+    from models.category import Category
+    return [category.id for category in Category.query.filter_by(user_id=user_id).order_by(Category.id)]
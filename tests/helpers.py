@@ -0,0 +1,31 @@
+from models.summary import MonthlySummary
+from utils.summary import rebuild_monthly_summaries
+
+def rollup_rows(user_id):
+    """The user's rollup as comparable tuples, leaving out rows emptied by deletes"""
+    rows = MonthlySummary.query.filter_by(user_id=user_id).all()
+    return sorted(
+        (str(row.month), row.category_id, round(row.income_total, 2), round(row.expense_total, 2),
+         row.income_count, row.expense_count)
+        for row in rows
+        if row.income_count or row.expense_count
+    )
+
+def assert_rollup_matches_rebuild(user_id):
+    """The incrementally maintained rollup equals one rebuilt from the ledger"""
+    incremental = rollup_rows(user_id)
+    rebuild_monthly_summaries(user_id)
+    assert incremental == rollup_rows(user_id)
+
+def add_expense(client, amount, day, category_id, description='item', is_income=False):
+    """Add a transaction through the expenses form"""
+    data = {
+        'amount': str(amount),
+        'description': description,
+        'date': day.isoformat(),
+        'category': category_id,
+        'recurring_frequency': 'none',
+    }
+    if is_income:
+        data['is_income'] = 'y'
+    assert client.post('/expenses', data=data).status_code == 302
@@ -0,0 +1,19 @@
+import pytest
+from models import db
+from models.user import User
+from utils.accounts import close_account
+from utils.identity_cache import identity_cache
+
+@pytest.mark.parametrize('ttl', [0, 30])
+def test_closed_account_sessions_are_logged_out(app, client, user_id, ttl):
+    app.config['IDENTITY_CACHE_TTL'] = ttl
+    identity_cache.clear()
+    assert client.get('/dashboard').status_code == 200
+
+    # Closed but not yet deleted, as while (or if) the deletion job fails
+    close_account(db.session.get(User, user_id))
+    db.session.commit()
+
+    response = client.get('/dashboard')
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
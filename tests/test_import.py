@@ -0,0 +1,28 @@
+import io
+from datetime import date
+from models import db
+from models.expense import Expense
+from models.category import Category
+from tests.helpers import add_expense, assert_rollup_matches_rebuild
+
+def test_rollup_matches_rebuild_after_import(client, user_id, category_ids):
+    add_expense(client, 20, date(2026, 4, 3), category_ids[0], 'existing')
+    statement = (
+        'Date,Description,Amount,Category\n'
+        '2026-04-01,Rent,-1200.00,Housing\n'
+        '2026-04-15,Salary,3000.00,\n'
+        '2026-05-02,Cinema,-18.50,Entertainment\n'
+        '2026-05-02,Mystery,-3.10,No such category\n'
+        'not a date,Broken,-1.00,\n'
+    )
+    response = client.post('/expenses/import', data={
+        'file': (io.BytesIO(statement.encode('utf-8')), 'statement.csv'),
+        'file_format': 'auto',
+    }, content_type='multipart/form-data')
+    assert response.status_code == 302
+
+    # The unparseable row is skipped; unknown categories fall back to 'Other'
+    assert Expense.query.filter_by(user_id=user_id).count() == 5
+    mystery = Expense.query.filter_by(user_id=user_id, description='Mystery').one()
+    assert db.session.get(Category, mystery.category_id).name == 'Other'
+    assert_rollup_matches_rebuild(user_id)
@@ -0,0 +1,45 @@
+from datetime import date, datetime
+import utils.summary
+from models.expense import Expense
+from utils.ledger_cache import ledger_stamp
+from tests.helpers import add_expense
+
+class FrozenClock(datetime):
+    """Every rollup write lands in the same second, as on MySQL DATETIME"""
+    @classmethod
+    def utcnow(cls):
+        return datetime(2026, 5, 1, 12, 0, 0)
+
+def test_stamp_changes_when_totals_do_not(client, user_id, category_ids, monkeypatch):
+    monkeypatch.setattr(utils.summary, 'datetime', FrozenClock)
+    add_expense(client, 30, date(2026, 4, 2), category_ids[0], 'books')
+    before = ledger_stamp(user_id)
+
+    # Same month, amount and type: only the category changes
+    books = Expense.query.filter_by(user_id=user_id, description='books').one()
+    response = client.post(f'/expenses/edit/{books.id}', data={
+        'amount': '30',
+        'description': 'books',
+        'date': '2026-04-02',
+        'category': category_ids[1],
+    })
+    assert response.status_code == 302
+
+    after = ledger_stamp(user_id)
+    assert after[:4] == before[:4]
+    assert after != before
+
+def test_api_etag_changes_after_category_move(client, user_id, category_ids, monkeypatch):
+    monkeypatch.setattr(utils.summary, 'datetime', FrozenClock)
+    add_expense(client, 12, date(2026, 4, 2), category_ids[0], 'lunch')
+    first = client.get('/api/charts/categories')
+    etag = first.headers['ETag']
+    assert client.get('/api/charts/categories', headers={'If-None-Match': etag}).status_code == 304
+
+    lunch = Expense.query.filter_by(user_id=user_id, description='lunch').one()
+    client.post(f'/expenses/edit/{lunch.id}', data={
+        'amount': '12', 'description': 'lunch', 'date': '2026-04-02', 'category': category_ids[2],
+    })
+    second = client.get('/api/charts/categories', headers={'If-None-Match': etag})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != etag
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+from models import db
+from models.expense import Expense
+from utils.pagination import keyset_paginate, encode_cursor
+
+def _seed_ledger(user_id, category_id, days):
+    """One expense per entry in `days`; repeated days give same-date ties"""
+    db.session.bulk_insert_mappings(Expense, [
+        {'user_id': user_id, 'category_id': category_id, 'amount': 1.0, 'description': f'row {i}',
+         'date': day, 'is_income': False}
+        for i, day in enumerate(days)
+    ])
+    db.session.commit()
+    return [expense.id for expense in Expense.query.filter_by(user_id=user_id).order_by(
+        Expense.date.desc(), Expense.id.desc()
+    )]
+
+def _ids(page):
+    return [expense.id for expense in page.items]
+
+def test_keyset_pages_cover_every_row_once(user_id, category_ids):
+    # Ties on one date straddle the page boundaries
+    start = date(2026, 6, 1)
+    days = [start] * 7 + [start - timedelta(days=n) for n in range(1, 6)]
+    expected = _seed_ledger(user_id, category_ids[0], days)
+    query = Expense.query.filter_by(user_id=user_id)
+
+    pages = [keyset_paginate(query, per_page=5)]
+    while pages[-1].has_next:
+        pages.append(keyset_paginate(query, after=pages[-1].next_cursor, per_page=5))
+
+    assert [len(page.items) for page in pages] == [5, 5, 2]
+    assert [expense_id for page in pages for expense_id in _ids(page)] == expected
+    assert not pages[0].has_prev and pages[0].prev_cursor is None
+    assert pages[-1].next_cursor is None
+
+    # Going back from the last page lands exactly on the previous one
+    back = keyset_paginate(query, before=pages[-1].prev_cursor, per_page=5)
+    assert _ids(back) == _ids(pages[1])
+    assert back.has_next and back.has_prev
+
+    back = keyset_paginate(query, before=back.prev_cursor, per_page=5)
+    assert _ids(back) == _ids(pages[0])
+    assert not back.has_prev
+
+def test_keyset_exact_page_boundaries(user_id, category_ids):
+    expected = _seed_ledger(user_id, category_ids[0], [date(2026, 6, 1) - timedelta(days=n) for n in range(4)])
+    query = Expense.query.filter_by(user_id=user_id)
+
+    # Exactly one full page has no next page
+    page = keyset_paginate(query, per_page=4)
+    assert _ids(page) == expected and not page.has_next
+
+    # A cursor on the oldest row gives an empty last page
+    oldest = db.session.get(Expense, expected[-1])
+    page = keyset_paginate(query, after=encode_cursor(oldest), per_page=4)
+    assert page.items == [] and not page.has_next and page.next_cursor is None
+
+    # A cursor on the newest row leaves nothing newer
+    newest = db.session.get(Expense, expected[0])
+    page = keyset_paginate(query, before=encode_cursor(newest), per_page=4)
+    assert page.items == [] and not page.has_prev
+
+    # A malformed cursor falls back to the first page
+    page = keyset_paginate(query, after='not-a-cursor', per_page=3)
+    assert _ids(page) == expected[:3] and not page.has_prev and page.has_next
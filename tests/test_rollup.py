@@ -0,0 +1,33 @@
+from datetime import date
+from models.expense import Expense
+from tests.helpers import add_expense, rollup_rows, assert_rollup_matches_rebuild
+
+def test_rollup_matches_rebuild_after_add_edit_delete(client, user_id, category_ids):
+    add_expense(client, 12.5, date(2026, 1, 31), category_ids[0], 'groceries')
+    add_expense(client, 40, date(2026, 2, 1), category_ids[1], 'fuel')
+    add_expense(client, 2500, date(2026, 2, 1), category_ids[2], 'salary', is_income=True)
+    add_expense(client, 7.25, date(2026, 2, 14), category_ids[0], 'coffee')
+    assert_rollup_matches_rebuild(user_id)
+
+    # Move a row to another month and category and flip its type
+    fuel = Expense.query.filter_by(user_id=user_id, description='fuel').one()
+    response = client.post(f'/expenses/edit/{fuel.id}', data={
+        'amount': '55',
+        'description': 'fuel refund',
+        'date': '2026-03-02',
+        'category': category_ids[3],
+        'is_income': 'y',
+    })
+    assert response.status_code == 302
+    assert_rollup_matches_rebuild(user_id)
+
+    # An invalid edit is rejected without touching the rollup
+    coffee = Expense.query.filter_by(user_id=user_id, description='coffee').one()
+    before = rollup_rows(user_id)
+    response = client.post(f'/expenses/edit/{coffee.id}', data={'amount': 'abc', 'date': '2026-02-14'})
+    assert response.status_code == 302
+    assert rollup_rows(user_id) == before
+    assert_rollup_matches_rebuild(user_id)
+
+    assert client.get(f'/expenses/delete/{coffee.id}').status_code == 302
+    assert_rollup_matches_rebuild(user_id)
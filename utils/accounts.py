@@ -0,0 +1,110 @@
+import uuid
+from datetime import datetime
+from models import db
+from models.user import User, CLOSED_PASSWORD_HASH
+from models.expense import Expense
+from models.category import Category
+from models.summary import MonthlySummary
+from models.recurring import RecurringMark
+from models.job import Job
+from utils.retention import delete_user_exports
+from utils.ledger_cache import ledger_cache
+from utils.identity_cache import identity_cache
+from utils.category_cache import category_cache
+
+def provision_user_categories(user_id):
+    """
+    Copy the default categories to a user with one INSERT ... SELECT.
+    Runs in the caller's transaction; the caller commits.
+    """
+    defaults = db.select(
+        Category.name,
+        Category.description,
+        Category.color,
+        db.literal(datetime.utcnow()),
+        db.literal(user_id)
+    ).where(Category.user_id.is_(None)).order_by(Category.id)
+
+    db.session.execute(Category.__table__.insert().from_select(
+        ['name', 'description', 'color', 'created_at', 'user_id'], defaults
+    ))
+    category_cache.invalidate(user_id)
+
+def close_account(user):
+    """
+    Lock an account out immediately and free its username and email.
+    The data stays until delete_account_data() removes it; the caller commits.
+    """
+    user.username = f'deleted-{user.id}-{uuid.uuid4().hex[:8]}'
+    user.email = f'deleted-{user.id}@invalid'
+    user.password_hash = CLOSED_PASSWORD_HASH
+
+    ledger_cache.invalidate(user.id)
+    identity_cache.invalidate(user.id)
+    category_cache.invalidate(user.id)
+
+def _delete_ids(model, ids):
+    model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+
+def delete_account_data(user_id, batch_size=1000, progress=None, keep_job_id=None):
+    """
+    Delete a closed account's data and then the user row, `batch_size`
+    rows per transaction, so a large account never holds long locks on
+    the shared tables. Every step only deletes what is left, so an
+    interrupted run can simply be started again.
+    `keep_job_id` is the job doing the deletion; its row is kept for the
+    record, detached from the user.
+    Returns the number of transactions deleted.
+    """
+    if progress is None:
+        progress = lambda percent: None
+
+    total = db.session.query(db.func.count(Expense.id)).filter(Expense.user_id == user_id).scalar()
+    deleted = 0
+
+    # Ledger, with the recurring schedule of each template in the same batch
+    while True:
+        ids = [expense_id for expense_id, in db.session.query(Expense.id).filter(
+            Expense.user_id == user_id
+        ).order_by(Expense.id).limit(batch_size)]
+        if not ids:
+            break
+        RecurringMark.query.filter(RecurringMark.template_id.in_(ids)).delete(synchronize_session=False)
+        _delete_ids(Expense, ids)
+        db.session.commit()
+        deleted += len(ids)
+        if total:
+            progress(min(90, 90 * deleted // total))
+
+    # Rollup rows, categories and other jobs
+    for model in (MonthlySummary, Category, Job):
+        while True:
+            query = db.session.query(model.id).filter(model.user_id == user_id)
+            if model is Job and keep_job_id:
+                query = query.filter(Job.id != keep_job_id)
+            ids = [row_id for row_id, in query.order_by(model.id).limit(batch_size)]
+            if not ids:
+                break
+            _delete_ids(model, ids)
+            db.session.commit()
+
+    # Export files and their manifest entries
+    while delete_user_exports(user_id, limit=batch_size):
+        db.session.commit()
+    progress(95)
+
+    if keep_job_id:
+        Job.query.filter_by(id=keep_job_id).update({Job.user_id: None}, synchronize_session=False)
+    User.query.filter_by(id=user_id).delete(synchronize_session=False)
+    db.session.commit()
+
+    ledger_cache.invalidate(user_id)
+    identity_cache.invalidate(user_id)
+    category_cache.invalidate(user_id)
+    return deleted
+
+def closed_account_ids():
+    """Ids of accounts that were closed but whose data hasn't been deleted yet"""
+    return [user_id for user_id, in db.session.query(User.id).filter(
+        User.password_hash == CLOSED_PASSWORD_HASH
+    ).order_by(User.id)]
@@ -2,12 +2,13 @@ from flask import redirect, url_for, flash, session
 from flask_login import LoginManager, current_user
 from functools import wraps
 from models.user import User
+from utils.identity_cache import load_cached_user
 
 login_manager = LoginManager()
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return load_cached_user(user_id)
 
 def setup_login_manager(app):
     login_manager.init_app(app)
@@ -0,0 +1,63 @@
+import time
+from collections import namedtuple
+from threading import Lock
+from flask import current_app
+from models import db
+from models.category import Category
+
+CategoryInfo = namedtuple('CategoryInfo', ['id', 'name', 'color'])
+
+def _load(user_id):
+    return tuple(
+        CategoryInfo(*row) for row in db.session.query(
+            Category.id, Category.name, Category.color
+        ).filter(Category.user_id == user_id).order_by(Category.id)
+    )
+
+class CategoryCache:
+    """
+    Per-process cache of each user's categories as CategoryInfo tuples.
+    Code that adds, edits or deletes categories calls invalidate(user_id)
+    after committing; CATEGORY_CACHE_TTL bounds how long other worker
+    processes can serve a stale list.
+    """
+    def __init__(self):
+        self._categories = {}
+        self._lock = Lock()
+
+    def get(self, user_id, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._categories.get(user_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        categories = _load(user_id)
+        with self._lock:
+            self._categories[user_id] = (now + ttl, categories)
+        return categories
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._categories.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._categories.clear()
+
+category_cache = CategoryCache()
+
+def get_user_categories(user_id):
+    """A user's categories, oldest first"""
+    ttl = current_app.config.get('CATEGORY_CACHE_TTL')
+    if not ttl:
+        return _load(user_id)
+    return category_cache.get(user_id, ttl)
+
+def category_choices(user_id):
+    """(id, name) pairs for SelectField choices"""
+    return [(c.id, c.name) for c in get_user_categories(user_id)]
+
+def category_lookup(user_id):
+    """{category id: CategoryInfo} for resolving names and colors"""
+    return {c.id: c for c in get_user_categories(user_id)}
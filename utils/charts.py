@@ -1,139 +1,308 @@
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import pandas as pd
 import os
+import random
 import json
-from datetime import datetime, timedelta
+import hashlib
+import tempfile
+from concurrent.futures import Future
+from datetime import datetime
+from flask import current_app, url_for
 from models.expense import Expense
-from models.category import Category
 from models import db
-import numpy as np
-import io
+from models.summary import MonthlySummary
+from utils.timeseries import time_series, recent_range, auto_granularity
+from utils.renderer import new_figure, build_and_render, submit, submit_render
+from utils.ledger_cache import get_ledger
+from utils.category_cache import category_lookup, get_user_categories
 import base64
 
-def generate_expense_pie_chart(user_id, save_path=None):
-    """Generate a pie chart of expenses by category"""
-    # Get expenses grouped by category
-    expenses = Expense.query.filter_by(user_id=user_id, is_income=False).all()
-    
-    if not expenses:
-        return None
-    
-    # Group expenses by category
-    category_totals = {}
-    for expense in expenses:
-        category_name = expense.category.name if expense.category else "Uncategorized"
-        if category_name in category_totals:
-            category_totals[category_name] += expense.amount
+def get_expense_category_totals(user_id):
+    """
+    Return expense totals per category as [(name, color, total), ...],
+    sorted by name. With the ledger cache enabled the totals are summed
+    from the user's in-memory arrays; otherwise one query groups expenses
+    by category_id in the database. Either way names and colors come from
+    the category cache, and rows without a known category are reported
+    as "Uncategorized".
+    """
+    ledger = get_ledger(user_id)
+    if ledger is not None:
+        totals = ledger.sum_by_category(is_income=False).items()
+    else:
+        totals = db.session.query(
+            Expense.category_id,
+            db.func.sum(Expense.amount)
+        ).filter(
+            Expense.user_id == user_id,
+            Expense.is_income == False
+        ).group_by(Expense.category_id).all()
+
+    # Names and colors come from the category cache instead of a join
+    categories = category_lookup(user_id)
+    rows = []
+    for category_id, total in totals:
+        category = categories.get(category_id)
+        if category:
+            rows.append((category.name, category.color, total or 0))
         else:
-            category_totals[category_name] = expense.amount
+            rows.append(("Uncategorized", None, total or 0))
+    return sorted(rows, key=lambda row: row[0])
+
+def _chart_output(image, save_path=None, fmt='png'):
+    """Write rendered chart bytes to save_path, or return them as a data URI"""
+    if save_path:
+        # Save chart to file
+        with open(save_path, 'wb') as f:
+            f.write(image)
+        return save_path
     
-    # Create pie chart
-    plt.figure(figsize=(10, 8))
-    plt.pie(
-        list(category_totals.values()),
-        labels=list(category_totals.keys()),
+    # Return as base64 encoded string for embedding in HTML
+    mime = 'image/svg+xml' if fmt == 'svg' else f'image/{fmt}'
+    encoded = base64.b64encode(image).decode('utf-8')
+    return f"data:{mime};base64,{encoded}"
+
+def build_pie_figure(category_totals):
+    """Build a pie chart Figure from [(name, color, total), ...]"""
+    fig = new_figure(figsize=(10, 8))
+    ax = fig.add_subplot()
+    ax.pie(
+        [total for _, _, total in category_totals],
+        labels=[name for name, _, _ in category_totals],
         autopct='%1.1f%%',
         startangle=90,
         shadow=True
     )
-    plt.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-    plt.title('Expense Distribution by Category')
-    
-    if save_path:
-        # Save chart to file
-        plt.savefig(save_path)
-        plt.close()
-        return save_path
-    else:
-        # Return as base64 encoded string for embedding in HTML
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png')
-        buffer.seek(0)
-        image_png = buffer.getvalue()
-        buffer.close()
-        plt.close()
-        
-        encoded = base64.b64encode(image_png).decode('utf-8')
-        return f"data:image/png;base64,{encoded}"
+    ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+    ax.set_title('Expense Distribution by Category')
+    return fig
 
-def generate_monthly_trend_chart(user_id, save_path=None, months=6):
-    """Generate a line chart showing expense trends over the last few months"""
-    # Calculate date range
-    end_date = datetime.utcnow().date()
-    start_date = (datetime.utcnow() - timedelta(days=30*months)).date()
-    
-    # Get expenses in date range
-    expenses = Expense.query.filter(
-        Expense.user_id == user_id,
-        Expense.date >= start_date,
-        Expense.date <= end_date
-    ).all()
-    
-    if not expenses:
-        return None
-    
-    # Create DataFrame from expenses
-    data = []
-    for expense in expenses:
-        data.append({
-            'date': expense.date,
-            'amount': expense.amount,
-            'type': 'Income' if expense.is_income else 'Expense'
-        })
-    
-    df = pd.DataFrame(data)
+TREND_TITLES = {
+    'day': 'Daily', 'week': 'Weekly', 'month': 'Monthly', 'quarter': 'Quarterly', 'year': 'Yearly'
+}
+
+def build_trend_figure(trend):
+    """Build a line chart Figure from a TimeSeries.to_dict()"""
+    labels = trend['labels']
+    
+    fig = new_figure(figsize=(12, 6))
+    ax = fig.add_subplot()
+    marker = 'o' if len(labels) <= 60 else None
+    ax.plot(labels, trend['income'], 'g-', marker=marker, label='Income')
+    ax.plot(labels, trend['expense'], 'r-', marker=marker, label='Expense')
+    ax.set_title(f"{TREND_TITLES[trend['granularity']]} Income vs Expenses")
+    ax.set_xlabel(trend['granularity'].capitalize())
+    ax.set_ylabel('Amount')
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend()
+    ax.tick_params(axis='x', labelrotation=45)
+    # Thin out the tick labels on long series
+    step = max(1, len(labels) // 24)
+    ax.set_xticks(range(0, len(labels), step))
+    ax.set_xticklabels(labels[::step])
+    fig.tight_layout()
+    return fig
+
+def build_budget_figure(categories, budget_values, actual_values):
+    """Build a grouped bar chart Figure comparing budget and actual spending"""
+    import numpy as np
+
+    x = np.arange(len(categories))  # the label locations
+    width = 0.35  # the width of the bars
     
-    # Group by month and type
-    df['month'] = df['date'].apply(lambda x: x.strftime('%Y-%m'))
-    monthly_data = df.groupby(['month', 'type'])['amount'].sum().unstack().fillna(0)
+    fig = new_figure(figsize=(12, 7))
+    ax = fig.add_subplot()
+    rects1 = ax.bar(x - width/2, budget_values, width, label='Budget', color='skyblue')
+    rects2 = ax.bar(x + width/2, actual_values, width, label='Actual', color='coral')
     
-    # Ensure both Income and Expense columns exist
-    if 'Income' not in monthly_data.columns:
-        monthly_data['Income'] = 0
-    if 'Expense' not in monthly_data.columns:
-        monthly_data['Expense'] = 0
+    # Add some text for labels, title and custom x-axis tick labels, etc.
+    ax.set_ylabel('Amount')
+    ax.set_title('Budget vs. Actual Spending by Category')
+    ax.set_xticks(x)
+    ax.set_xticklabels(categories, rotation=45, ha='right')
+    ax.legend()
     
-    # Sort by month
-    monthly_data = monthly_data.sort_index()
+    # Add value labels on bars
+    def autolabel(rects):
+        for rect in rects:
+            height = rect.get_height()
+            ax.annotate(f'{height:.0f}',
+                        xy=(rect.get_x() + rect.get_width() / 2, height),
+                        xytext=(0, 3),  # 3 points vertical offset
+                        textcoords="offset points",
+                        ha='center', va='bottom')
     
-    # Create line chart
-    plt.figure(figsize=(12, 6))
-    plt.plot(monthly_data.index, monthly_data['Income'], 'g-', marker='o', label='Income')
-    plt.plot(monthly_data.index, monthly_data['Expense'], 'r-', marker='o', label='Expense')
-    plt.title('Monthly Income vs Expenses')
-    plt.xlabel('Month')
-    plt.ylabel('Amount')
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.legend()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    autolabel(rects1)
+    autolabel(rects2)
     
-    if save_path:
-        # Save chart to file
-        plt.savefig(save_path)
-        plt.close()
-        return save_path
+    fig.tight_layout()
+    return fig
+
+def get_trend_series(user_id, months=6, start_date=None, end_date=None, granularity=None):
+    """
+    Return a gap-filled TimeSeries for the trend charts: the last `months`
+    calendar months by default, or the given date range. Without an explicit
+    granularity a range is bucketed as finely as fits in about 60 points.
+    Returns None when the user has no transactions to anchor an open range.
+    """
+    if start_date is None and end_date is None:
+        start_date, end_date = recent_range(granularity or 'month', months)
     else:
-        # Return as base64 encoded string for embedding in HTML
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png')
-        buffer.seek(0)
-        image_png = buffer.getvalue()
-        buffer.close()
-        plt.close()
-        
-        encoded = base64.b64encode(image_png).decode('utf-8')
-        return f"data:image/png;base64,{encoded}"
+        if start_date is None:
+            start_date = db.session.query(db.func.min(MonthlySummary.month)).filter(
+                MonthlySummary.user_id == user_id
+            ).scalar()
+            if start_date is None:
+                return None
+        end_date = end_date or datetime.utcnow().date()
+        if start_date > end_date:
+            return None
+    return time_series(user_id, start_date, end_date, granularity or auto_granularity(start_date, end_date))
+
+# Chart image cache
+#
+# Rendered charts are stored under CHART_CACHE_FOLDER named by their
+# owner and a hash of their input series and parameters, so identical data
+# is only rendered once and a file is only ever served to its owner. File mtimes double as the LRU clock: hits touch the file, and each
+# new render evicts the least recently used files beyond the size caps.
+
+CHART_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+def chart_cache_key(user_id, kind, data, fmt='png'):
+    """Content address for a chart: sha256 of its owner, kind, input series and format"""
+    payload = json.dumps([user_id, kind, fmt, data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_chart_cache_folder():
+    return current_app.config.get('CHART_CACHE_FOLDER') or \
+        os.path.join(current_app.static_folder, 'temp', 'charts')
+
+def chart_cache_filename(user_id, key, fmt='png'):
+    return f'{user_id}-{key}.{fmt}'
+
+def chart_cache_path(user_id, key, fmt='png'):
+    return os.path.join(get_chart_cache_folder(), chart_cache_filename(user_id, key, fmt))
+
+def evict_chart_cache(folder, max_files, max_bytes):
+    """Delete least recently used chart files until the folder is within both caps"""
+    entries = []
+    total = 0
+    with os.scandir(folder) as it:
+        for entry in it:
+            # Temp files belong to renders still in progress
+            if not entry.is_file() or entry.name.endswith('.tmp'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+    entries.sort()
+    count = len(entries)
+    for _, size, path in entries:
+        if count <= max_files and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        count -= 1
+        total -= size
 
-def generate_budget_comparison_chart(user_id, save_path=None):
+def _render_to_cache(build, args, fmt, path, max_files, max_bytes):
+    image = build_and_render(build, args, fmt)
+
+    # Write to a temp file of our own and rename it into place, so
+    # readers never see a partial file and overlapping renders of the same
+    # key (other threads or workers) don't clobber each other's writes
+    folder = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(image)
+        os.replace(tmp_path, path)
+    except FileNotFoundError:
+        # Another render already published this key; ours is identical
+        pass
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    evict_chart_cache(folder, max_files, max_bytes)
+    return image
+
+class CachedChart:
+    """A chart render that may already be cached; result() returns the image bytes"""
+    def __init__(self, key, fmt, future):
+        self.key = key
+        self.fmt = fmt
+        self.future = future
+
+    def result(self):
+        return self.future.result()
+
+    @property
+    def url(self):
+        return url_for('reports.chart_image', key=self.key, fmt=self.fmt)
+
+def submit_cached_chart(user_id, kind, build, data, fmt='png'):
+    """Return a user's CachedChart, rendering `build(data)` on the render pool only on a cache miss"""
+    key = chart_cache_key(user_id, kind, data, fmt)
+    path = chart_cache_path(user_id, key, fmt)
+
+    try:
+        with open(path, 'rb') as f:
+            image = f.read()
+        os.utime(path)  # Mark as recently used
+        future = Future()
+        future.set_result(image)
+        return CachedChart(key, fmt, future)
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    future = submit(
+        _render_to_cache, build, (data,), fmt, path,
+        current_app.config['CHART_CACHE_MAX_FILES'],
+        current_app.config['CHART_CACHE_MAX_BYTES']
+    )
+    return CachedChart(key, fmt, future)
+
+def submit_expense_pie_chart(user_id, fmt='png'):
+    """Query category totals and queue the pie chart render; returns a CachedChart or None"""
+    category_totals = get_expense_category_totals(user_id)
+    if not category_totals:
+        return None
+    return submit_cached_chart(user_id, 'pie', build_pie_figure, category_totals, fmt)
+
+def submit_monthly_trend_chart(user_id, months=6, fmt='png', start_date=None, end_date=None):
+    """Query bucketed totals and queue the trend chart render; returns a CachedChart or None"""
+    series = get_trend_series(user_id, months, start_date, end_date)
+    if series is None or series.is_empty():
+        return None
+    return submit_cached_chart(user_id, 'trend', build_trend_figure, series.to_dict(), fmt)
+
+def generate_expense_pie_chart(user_id, save_path=None, fmt='png'):
+    """Generate a pie chart of expenses by category"""
+    future = submit_expense_pie_chart(user_id, fmt)
+    if future is None:
+        return None
+    return _chart_output(future.result(), save_path, fmt)
+
+def generate_monthly_trend_chart(user_id, save_path=None, months=6, fmt='png'):
+    """Generate a line chart showing expense trends over the last few months"""
+    future = submit_monthly_trend_chart(user_id, months, fmt)
+    if future is None:
+        return None
+    return _chart_output(future.result(), save_path, fmt)
+
+def generate_budget_comparison_chart(user_id, save_path=None, fmt='png'):
     """Generate a bar chart comparing budget vs actual spending by category"""
     # This is a placeholder - in a real app, you'd have a budget model
     # For now, we'll simulate budget data
     
     # Get actual expenses by category
-    categories = Category.query.filter_by(user_id=user_id).all()
+    categories = get_user_categories(user_id)
     
     if not categories:
         return None
@@ -154,144 +323,59 @@ def generate_budget_comparison_chart(user_id, save_path=None):
         
         actual_data[category.name] = actual_spending
     
-    # Create bar chart
-    categories = list(budget_data.keys())
-    budget_values = list(budget_data.values())
-    actual_values = [actual_data[cat] for cat in categories]
-    
-    x = np.arange(len(categories))  # the label locations
-    width = 0.35  # the width of the bars
-    
-    fig, ax = plt.subplots(figsize=(12, 7))
-    rects1 = ax.bar(x - width/2, budget_values, width, label='Budget', color='skyblue')
-    rects2 = ax.bar(x + width/2, actual_values, width, label='Actual', color='coral')
-    
-    # Add some text for labels, title and custom x-axis tick labels, etc.
-    ax.set_ylabel('Amount')
-    ax.set_title('Budget vs. Actual Spending by Category')
-    ax.set_xticks(x)
-    ax.set_xticklabels(categories, rotation=45, ha='right')
-    ax.legend()
-    
-    # Add value labels on bars
-    def autolabel(rects):
-        for rect in rects:
-            height = rect.get_height()
-            ax.annotate(f'{height:.0f}',
-                        xy=(rect.get_x() + rect.get_width() / 2, height),
-                        xytext=(0, 3),  # 3 points vertical offset
-                        textcoords="offset points",
-                        ha='center', va='bottom')
-    
-    autolabel(rects1)
-    autolabel(rects2)
-    
-    plt.tight_layout()
-    
-    if save_path:
-        # Save chart to file
-        plt.savefig(save_path)
-        plt.close()
-        return save_path
-    else:
-        # Return as base64 encoded string for embedding in HTML
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png')
-        buffer.seek(0)
-        image_png = buffer.getvalue()
-        buffer.close()
-        plt.close()
-        
-        encoded = base64.b64encode(image_png).decode('utf-8')
-        return f"data:image/png;base64,{encoded}"
+    names = list(budget_data.keys())
+    image = submit_render(
+        build_budget_figure,
+        names,
+        [budget_data[name] for name in names],
+        [actual_data[name] for name in names],
+        fmt=fmt
+    ).result()
+    return _chart_output(image, save_path, fmt)
 
 def generate_chart_data_for_js(user_id):
     """Generate chart data in JSON format for Chart.js"""
-    # Get expenses grouped by category
-    expenses = Expense.query.filter_by(user_id=user_id, is_income=False).all()
+    # Get expenses grouped by category, with their colors
+    category_totals = get_expense_category_totals(user_id)
     
-    if not expenses:
+    if not category_totals:
         return json.dumps({})
     
-    # Group expenses by category
-    category_totals = {}
-    for expense in expenses:
-        category_name = expense.category.name if expense.category else "Uncategorized"
-        if category_name in category_totals:
-            category_totals[category_name] += expense.amount
-        else:
-            category_totals[category_name] = expense.amount
-    
-    # Get category colors
-    categories = Category.query.filter_by(user_id=user_id).all()
-    category_colors = {cat.name: cat.color for cat in categories}
-    
     # Prepare data for Chart.js
     chart_data = {
-        'labels': list(category_totals.keys()),
+        'labels': [name for name, _, _ in category_totals],
         'datasets': [{
-            'data': list(category_totals.values()),
-            'backgroundColor': [category_colors.get(cat, "#" + ''.join([f'{np.random.randint(0, 255):02x}' for _ in range(3)])) 
-                               for cat in category_totals.keys()]
+            'data': [total for _, _, total in category_totals],
+            'backgroundColor': [color or "#" + ''.join([f'{random.randint(0, 255):02x}' for _ in range(3)])
+                               for _, color, _ in category_totals]
         }]
     }
     
     return json.dumps(chart_data)
 
-def generate_monthly_data_for_js(user_id, months=6):
-    """Generate monthly trend data in JSON format for Chart.js"""
-    # Calculate date range
-    end_date = datetime.utcnow().date()
-    start_date = (datetime.utcnow() - timedelta(days=30*months)).date()
-    
-    # Get expenses in date range
-    expenses = Expense.query.filter(
-        Expense.user_id == user_id,
-        Expense.date >= start_date,
-        Expense.date <= end_date
-    ).all()
+def generate_monthly_data_for_js(user_id, months=6, start_date=None, end_date=None, granularity=None):
+    """Generate trend data in JSON format for Chart.js"""
+    # Bucketed in the database, with empty periods filled in as zero
+    series = get_trend_series(user_id, months, start_date, end_date, granularity)
     
-    if not expenses:
+    if series is None or series.is_empty():
         return json.dumps({})
     
-    # Create DataFrame from expenses
-    data = []
-    for expense in expenses:
-        data.append({
-            'date': expense.date,
-            'amount': expense.amount,
-            'type': 'Income' if expense.is_income else 'Expense'
-        })
-    
-    df = pd.DataFrame(data)
-    
-    # Group by month and type
-    df['month'] = df['date'].apply(lambda x: x.strftime('%Y-%m'))
-    monthly_data = df.groupby(['month', 'type'])['amount'].sum().unstack().fillna(0)
-    
-    # Ensure both Income and Expense columns exist
-    if 'Income' not in monthly_data.columns:
-        monthly_data['Income'] = 0
-    if 'Expense' not in monthly_data.columns:
-        monthly_data['Expense'] = 0
-    
-    # Sort by month
-    monthly_data = monthly_data.sort_index()
-    
     # Prepare data for Chart.js
     chart_data = {
-        'labels': monthly_data.index.tolist(),
+        'granularity': series.granularity,
+        'labels': series.labels,
         'datasets': [
             {
                 'label': 'Income',
-                'data': monthly_data['Income'].tolist(),
+                'data': series.income,
                 'borderColor': 'rgba(75, 192, 192, 1)',
                 'backgroundColor': 'rgba(75, 192, 192, 0.2)',
                 'fill': True
             },
             {
                 'label': 'Expense',
-                'data': monthly_data['Expense'].tolist(),
+                'data': series.expense,
                 'borderColor': 'rgba(255, 99, 132, 1)',
                 'backgroundColor': 'rgba(255, 99, 132, 0.2)',
                 'fill': True
@@ -0,0 +1,126 @@
+import click
+from utils.summary import rebuild_monthly_summaries
+from utils.retention import sweep_exports
+from utils.jobs import run_pending_jobs
+from utils.importer import PARSERS, detect_format, import_transactions
+from utils.recurring import materialize_recurring
+
+def register_commands(app):
+    """Attach the maintenance CLI commands to an application"""
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing tables and seed the default categories"""
+        from utils.init import init_db
+
+        created = init_db()
+        click.echo(f'Database ready ({created} default categories added).')
+
+    @app.cli.command('rebuild-summaries')
+    @click.option('--user-id', type=int, default=None, help='Only rebuild this user')
+    def rebuild_summaries_command(user_id):
+        """Rebuild the monthly rollup table from the expenses ledger"""
+        rows = rebuild_monthly_summaries(user_id)
+        click.echo(f'Rebuilt {rows} monthly summary rows.')
+
+    @app.cli.command('import-transactions')
+    @click.argument('user_id', type=int)
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'file_format', type=click.Choice(['auto', 'csv', 'ofx']), default='auto')
+    @click.option('--date-format', default=None, help='strptime format for CSV dates')
+    @click.option('--batch-size', type=int, default=None, help='Rows per INSERT batch')
+    def import_transactions_command(user_id, path, file_format, date_format, batch_size):
+        """Bulk import a bank CSV or OFX statement for a user"""
+        if file_format == 'auto':
+            file_format = detect_format(path)
+
+        def report(chunk):
+            click.echo(
+                f"chunk {chunk['chunk']}: {chunk['rows']} rows in {chunk['seconds']:.2f}s"
+                f" ({chunk['rows_per_second']:.0f} rows/s)"
+            )
+
+        with open(path, 'rb') as f:
+            if file_format == 'csv':
+                records = PARSERS['csv'](f, date_format=date_format)
+            else:
+                records = PARSERS['ofx'](f)
+            stats = import_transactions(
+                user_id,
+                records,
+                batch_size=batch_size or app.config['IMPORT_BATCH_SIZE'],
+                on_chunk=report
+            )
+
+        click.echo(f"Imported {stats['rows']} rows ({stats['skipped']} skipped) in {stats['seconds']:.2f}s.")
+
+    @app.cli.command('materialize-recurring')
+    @click.option('--horizon', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Generate occurrences up to this date (default: today)')
+    @click.option('--batch-size', type=int, default=5000, help='Rows per INSERT batch and templates per transaction')
+    def materialize_recurring_command(horizon, batch_size):
+        """Insert due occurrences of recurring transactions"""
+        inserted = materialize_recurring(horizon.date() if horizon else None, batch_size)
+        click.echo(f'Inserted {inserted} recurring transactions.')
+
+    @app.cli.command('sweep-exports')
+    @click.option('--days', type=int, default=None, help='Maximum export age (default: EXPORT_RETENTION_DAYS)')
+    @click.option('--orphans', is_flag=True, help='Also remove old files missing from the manifest')
+    def sweep_exports_command(days, orphans):
+        """Delete exports past the retention age or over per-user quotas"""
+        removed = sweep_exports(
+            days if days is not None else app.config['EXPORT_RETENTION_DAYS'],
+            app.config['EXPORT_QUOTA_BYTES_PER_USER'],
+            scan_orphans=orphans
+        )
+        click.echo(f'Removed {removed} export files.')
+
+    @app.cli.command('run-jobs')
+    @click.option('--limit', type=int, default=None, help='Maximum number of jobs to run')
+    def run_jobs_command(limit):
+        """Run queued background jobs in this process"""
+        count = run_pending_jobs(limit)
+        click.echo(f'Ran {count} jobs.')
+
+    @app.cli.command('purge-closed-accounts')
+    def purge_closed_accounts_command():
+        """Finish deleting closed accounts, e.g. after a deletion job failed or was lost"""
+        from utils.accounts import closed_account_ids, delete_account_data
+
+        batch_size = app.config['ACCOUNT_DELETION_BATCH_SIZE']
+        user_ids = closed_account_ids()
+        for user_id in user_ids:
+            deleted = delete_account_data(user_id, batch_size=batch_size)
+            click.echo(f'Deleted account {user_id} ({deleted} transactions).')
+        click.echo(f'{len(user_ids)} closed accounts purged.')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Create the transaction search index, or re-fill it from the ledger"""
+        from utils.search import ensure_search_index
+
+        created = ensure_search_index(rebuild=True)
+        click.echo('Search index created.' if created else 'Search index rebuilt.')
+
+    @app.cli.command('explain-queries')
+    @click.option('--user-id', type=int, default=1, help='User id to bind into the queries')
+    @click.option('--create-missing', is_flag=True, help='Create declared indexes missing from the database')
+    def explain_queries_command(user_id, create_missing):
+        """EXPLAIN the app's hot ledger queries and report full table scans"""
+        from utils.index_advisor import explain_canonical_queries, missing_indexes, create_missing_indexes
+
+        if create_missing:
+            for name in create_missing_indexes():
+                click.echo(f'Created index {name}')
+        else:
+            for index in missing_indexes():
+                click.echo(f'Missing index {index.name} (run with --create-missing)')
+
+        scans_found = False
+        for name, plan, scans in explain_canonical_queries(user_id):
+            click.echo(f"{name}: {'FULL SCAN' if scans else 'ok'}")
+            for row in plan:
+                click.echo(f'    {row}')
+            scans_found = scans_found or bool(scans)
+
+        if scans_found:
+            raise SystemExit(1)
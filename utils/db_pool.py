@@ -0,0 +1,113 @@
+import time
+from threading import Lock
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that keeps counters for sizing it from real traffic.
+    A checkout "waits" when no idle connection is available and the pool
+    is already at pool_size + max_overflow, i.e. the caller has to block
+    until another request checks a connection back in.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self._checked_out = set()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+
+    def _do_get(self):
+        at_capacity = self.checkedin() == 0 and self._max_overflow > -1 and self.overflow() >= self._max_overflow
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+                self.waits += 1
+                self.wait_seconds += time.perf_counter() - started
+            raise
+
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.checkouts += 1
+            if at_capacity:
+                self.waits += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            self._checked_out.add(record)
+            self.peak_checked_out = max(self.peak_checked_out, len(self._checked_out))
+            self.peak_overflow = max(self.peak_overflow, self.overflow())
+        return record
+
+    def _do_return_conn(self, record):
+        with self._stats_lock:
+            self._checked_out.discard(record)
+        super()._do_return_conn(record)
+
+    def connection_ages(self):
+        """Seconds since each open connection (idle or checked out) was established"""
+        now = time.time()
+        with self._stats_lock:
+            records = list(self._checked_out)
+        records.extend(self._pool.queue)
+        return [now - record.starttime for record in records if record.connection is not None]
+
+    def stats(self):
+        ages = self.connection_ages()
+        return {
+            'pool_size': self.size(),
+            'max_overflow': self._max_overflow,
+            'timeout': self._timeout,
+            'recycle': self._recycle,
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            'checkouts': self.checkouts,
+            'waits': self.waits,
+            'wait_seconds': round(self.wait_seconds, 6),
+            'max_wait_seconds': round(self.max_wait_seconds, 6),
+            'timeouts': self.timeouts,
+            'peak_checked_out': self.peak_checked_out,
+            'peak_overflow': max(self.peak_overflow, 0),
+            'connections': len(ages),
+            'oldest_connection_seconds': round(max(ages), 3) if ages else None,
+            'mean_connection_age_seconds': round(sum(ages) / len(ages), 3) if ages else None,
+        }
+
+def init_pool(app):
+    """
+    Merge the DB_POOL_* settings into SQLALCHEMY_ENGINE_OPTIONS.
+    Must run before db.init_app(). SQLite keeps SQLAlchemy's own pool,
+    which doesn't take these options.
+    """
+    config = app.config
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+
+    if url.get_backend_name() != 'sqlite':
+        options.setdefault('poolclass', InstrumentedQueuePool)
+        options.setdefault('pool_size', config['DB_POOL_SIZE'])
+        options.setdefault('max_overflow', config['DB_MAX_OVERFLOW'])
+        options.setdefault('pool_timeout', config['DB_POOL_TIMEOUT'])
+        options.setdefault('pool_recycle', config['DB_POOL_RECYCLE'])
+    options.setdefault('pool_pre_ping', config['DB_POOL_PRE_PING'])
+
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def pool_stats(engine):
+    """Return the engine's pool counters, or just its status line for other pool classes"""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        stats = pool.stats()
+    else:
+        stats = {'status': pool.status()}
+    stats['class'] = type(pool).__name__
+    return stats
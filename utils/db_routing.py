@@ -0,0 +1,39 @@
+import time
+from functools import wraps
+from flask import current_app, has_request_context, session
+from sqlalchemy import event
+from models import db, RoutingSession
+
+PIN_KEY = '_primary_until'
+
+def use_replica(enabled=True):
+    """Route the current session's reads to the replica bind, if one is configured"""
+    db.session.info['use_replica'] = enabled
+
+def primary_until():
+    """End of the current user's read-your-writes window as a Unix time, or 0"""
+    return session.get(PIN_KEY, 0) if has_request_context() else 0
+
+def pinned_to_primary(until=None):
+    """True while the current user (or a job given its `until`) is inside the read-your-writes window"""
+    if until is None:
+        until = primary_until()
+    return until > time.time()
+
+def read_only(view):
+    """
+    Serve a view's queries from the read replica.
+    Users who committed a write in the last READ_YOUR_WRITES_SECONDS stay
+    on the primary so they don't see stale data from replication lag.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not pinned_to_primary():
+            use_replica()
+        return view(*args, **kwargs)
+    return wrapper
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _pin_after_write(db_session):
+    if has_request_context():
+        session[PIN_KEY] = time.time() + current_app.config['READ_YOUR_WRITES_SECONDS']
@@ -1,135 +1,86 @@
 import os
+import io
 import csv
-import pandas as pd
 from datetime import datetime
-from flask import current_app
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from flask import current_app, Response, stream_with_context
+from models import db
 from models.expense import Expense
 from models.category import Category
-from models.user import User
-from utils.charts import generate_expense_pie_chart, generate_monthly_trend_chart, generate_budget_comparison_chart
-
-def export_to_csv(user_id, start_date=None, end_date=None):
-    filename = f"user_{user_id}_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    path = os.path.join(current_app.config['CSV_FOLDER'], filename)
-
-    with open(path, mode='w', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        writer.writerow(['Date', 'Category', 'Amount', 'Type'])
-
-        expenses = Expense.query.filter_by(user_id=user_id).all()
-        for e in expenses:
-            writer.writerow([
-                e.date,
-                e.category.name if e.category else 'N/A',
-                e.amount,
-                'Income' if e.is_income else 'Expense'
-            ])
-
-    return path
-
-def export_to_pdf(user_id, start_date=None, end_date=None, include_charts=True):
-    user = User.query.get(user_id)
-    if not user:
-        return None
-
-    query = Expense.query.filter_by(user_id=user_id)
+from models.export import Export
+
+CSV_HEADER = ['Date', 'Category', 'Amount', 'Type']
+
+def export_folder(file_type):
+    return current_app.config['PDF_FOLDER' if file_type == 'pdf' else 'CSV_FOLDER']
+
+def record_export(user_id, path, file_type):
+    """Add a written export file to the manifest"""
+    db.session.add(Export(
+        user_id=user_id,
+        file_type=file_type,
+        filename=os.path.basename(path),
+        size=os.path.getsize(path)
+    ))
+    db.session.commit()
+
+def get_recent_exports(user_id, limit=10):
+    """A user's newest exports from the manifest, without touching the export folders"""
+    return Export.query.filter_by(user_id=user_id).order_by(Export.created_at.desc()).limit(limit).all()
+
+def _csv_rows(user_id, start_date=None, end_date=None, category_ids=None, chunk_size=1000):
+    """
+    Yield CSV rows for a user's ledger, joined with category names.
+    Rows are fetched from a server-side cursor `chunk_size` at a time,
+    so memory use doesn't grow with the size of the ledger.
+    """
+    query = db.session.query(
+        Expense.date,
+        Category.name,
+        Expense.amount,
+        Expense.is_income
+    ).select_from(Expense).outerjoin(
+        Category, Expense.category_id == Category.id
+    ).filter(Expense.user_id == user_id)
 
     if start_date:
         query = query.filter(Expense.date >= start_date)
     if end_date:
         query = query.filter(Expense.date <= end_date)
-
-    expenses = query.order_by(Expense.date.desc()).all()
-    if not expenses:
-        return None
-
-    os.makedirs(current_app.config['PDF_FOLDER'], exist_ok=True)
-
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"user_{user_id}_expenses_{timestamp}.pdf"
-    filepath = os.path.join(current_app.config['PDF_FOLDER'], filename)
-
-    doc = SimpleDocTemplate(filepath, pagesize=A4)
-    styles = getSampleStyleSheet()
-    elements = []
-
-    elements.append(Paragraph(f"Financial Report for {user.username}", styles['Heading1']))
-    elements.append(Spacer(1, 0.25 * inch))
-
-    if start_date and end_date:
-        date_text = f"{start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}"
-    elif start_date:
-        date_text = f"From {start_date:%Y-%m-%d}"
-    elif end_date:
-        date_text = f"Until {end_date:%Y-%m-%d}"
-    else:
-        date_text = "All transactions"
-
-    elements.append(Paragraph(date_text, styles['Normal']))
-    elements.append(Spacer(1, 0.25 * inch))
-
-    total_income = sum(e.amount for e in expenses if e.is_income)
-    total_expense = sum(e.amount for e in expenses if not e.is_income)
-    balance = total_income - total_expense
-
-    summary = Table([
-        ["Total Income", f"₹{total_income:.2f}"],
-        ["Total Expense", f"₹{total_expense:.2f}"],
-        ["Balance", f"₹{balance:.2f}"]
-    ])
-    summary.setStyle(TableStyle([
-        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-        ('TEXTCOLOR', (1,2), (1,2), colors.green if balance >=0 else colors.red)
-    ]))
-    elements.append(summary)
-    elements.append(Spacer(1, 0.5 * inch))
-
-    if include_charts:
-        temp_dir = os.path.join(current_app.static_folder, 'temp')
-        os.makedirs(temp_dir, exist_ok=True)
-
-        pie_path = os.path.join(temp_dir, f'pie_{user_id}.png')
-        trend_path = os.path.join(temp_dir, f'trend_{user_id}.png')
-
-        if generate_expense_pie_chart(user_id, pie_path):
-            elements.append(Image(pie_path, width=5 * inch, height=4 * inch))
-
-        if generate_monthly_trend_chart(user_id, trend_path):
-            elements.append(Image(trend_path, width=5 * inch, height=3 * inch))
-
-    data = [["Date", "Description", "Category", "Amount", "Type"]]
-    for e in expenses:
-        data.append([
-            e.date.strftime('%Y-%m-%d'),
-            e.description or "",
-            e.category.name if e.category else "Uncategorized",
-            f"₹ {e.amount:.2f}",
-            "Income" if e.is_income else "Expense"
-        ])
-
-    table = Table(data, colWidths=[1*inch, 2.5*inch, 1.5*inch, 1*inch, 1*inch])
-    style = [
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('ALIGN', (3,1), (3,-1), 'RIGHT'),
-    ]
-    
-    for i, e in enumerate(expenses, start=1):
-        if e.is_income:
-            style.append(('TEXTCOLOR', (3, i), (3, i), colors.green))
-        else:
-            style.append(('TEXTCOLOR', (3, i), (3, i), colors.black))
-    
-    
-    table.setStyle(TableStyle(style))
-    
-
-    elements.append(table)
-    doc.build(elements)
-
-    return filepath
+    if category_ids:
+        query = query.filter(Expense.category_id.in_(category_ids))
+
+    query = query.order_by(Expense.date.desc(), Expense.id.desc())
+    for day, category_name, amount, is_income in query.execution_options(stream_results=True).yield_per(chunk_size):
+        yield [
+            day,
+            category_name or 'N/A',
+            amount,
+            'Income' if is_income else 'Expense'
+        ]
+
+def stream_csv(user_id, start_date=None, end_date=None, category_ids=None, chunk_size=1000):
+    """Generate a CSV export as text chunks of roughly `chunk_size` rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+
+    rows = 0
+    for row in _csv_rows(user_id, start_date, end_date, category_ids, chunk_size):
+        writer.writerow(row)
+        rows += 1
+        if rows % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+def csv_download_response(user_id, start_date=None, end_date=None, category_ids=None):
+    """Stream a CSV export straight into an attachment response"""
+    filename = f"user_{user_id}_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    chunk_size = current_app.config.get('CSV_STREAM_CHUNK_SIZE', 1000)
+    return Response(
+        stream_with_context(stream_csv(user_id, start_date, end_date, category_ids, chunk_size)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
@@ -0,0 +1,82 @@
+import time
+from threading import Lock
+from flask import current_app
+from flask_login import UserMixin
+from models import db
+from models.user import User, CLOSED_PASSWORD_HASH
+
+class UserSnapshot(UserMixin):
+    """
+    Read-only copy of the User columns that requests need.
+    It isn't attached to any session, so it can be shared between requests
+    and threads. Views that change the user must load the real User row.
+    """
+    __slots__ = ('id', 'username', 'email', 'created_at', 'last_login')
+
+    def __init__(self, id, username, email, created_at, last_login):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.created_at = created_at
+        self.last_login = last_login
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+
+def load_active_user(user_id, *entities):
+    """
+    Load a user (or just the given columns) unless the account is closed.
+    Closed accounts are locked out while their data is deleted, so every
+    session of theirs stops authenticating at once, cached or not.
+    """
+    return db.session.query(*(entities or (User,))).filter(
+        User.id == user_id,
+        User.password_hash != CLOSED_PASSWORD_HASH
+    ).first()
+
+class IdentityCache:
+    """
+    Per-process TTL cache of UserSnapshots for the Flask-Login user_loader.
+    Changes made in this process invalidate the entry immediately; other
+    worker processes pick them up within IDENTITY_CACHE_TTL seconds.
+    """
+    def __init__(self):
+        self._users = {}
+        self._lock = Lock()
+
+    def get(self, user_id, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        row = load_active_user(user_id, User.id, User.username, User.email, User.created_at, User.last_login)
+        if row is None:
+            self.invalidate(user_id)
+            return None
+
+        snapshot = UserSnapshot(*row)
+        with self._lock:
+            self._users[user_id] = (now + ttl, snapshot)
+            # Drop expired entries once the cache has grown
+            if len(self._users) > 1000:
+                self._users = {key: value for key, value in self._users.items() if value[0] > now}
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+identity_cache = IdentityCache()
+
+def load_cached_user(user_id):
+    """user_loader body: a cached UserSnapshot, or the User row when IDENTITY_CACHE_TTL is 0"""
+    ttl = current_app.config.get('IDENTITY_CACHE_TTL')
+    if not ttl:
+        return load_active_user(int(user_id))
+    return identity_cache.get(int(user_id), ttl)
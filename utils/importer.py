@@ -0,0 +1,206 @@
+import io
+import re
+import csv
+import time
+import logging
+from datetime import datetime
+from models import db
+from models.expense import Expense
+from utils.summary import summary_deltas, apply_summary_deltas
+from utils.category_cache import get_user_categories
+
+logger = logging.getLogger(__name__)
+
+# Header aliases used by common bank exports, matched case-insensitively
+CSV_COLUMNS = {
+    'date': ['date', 'transaction date', 'posted date', 'posting date', 'value date'],
+    'description': ['description', 'memo', 'payee', 'details', 'narration', 'name'],
+    'amount': ['amount', 'value', 'transaction amount'],
+    'debit': ['debit', 'withdrawal', 'withdrawals', 'money out'],
+    'credit': ['credit', 'deposit', 'deposits', 'money in'],
+    'category': ['category'],
+    'type': ['type', 'transaction type'],
+}
+
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%Y/%m/%d', '%d %b %Y']
+
+def parse_date(value, date_format=None):
+    value = value.strip()
+    for fmt in ([date_format] if date_format else DATE_FORMATS):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Unrecognised date: {value!r}')
+
+def parse_amount(value):
+    """Parse '1,234.50', '(12.00)' or '-12' into a float"""
+    value = value.strip().replace(',', '').replace('₹', '').replace('$', '')
+    if value.startswith('(') and value.endswith(')'):
+        value = '-' + value[1:-1]
+    return float(value) if value else 0.0
+
+def _text_stream(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+
+def _match_columns(fieldnames):
+    lookup = {name.strip().lower(): name for name in fieldnames if name}
+    columns = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in lookup:
+                columns[field] = lookup[alias]
+                break
+    return columns
+
+def parse_csv(stream, date_format=None):
+    """
+    Yield transaction records from a bank CSV, one row at a time.
+    Amounts are signed (negative = expense) unless the file has a
+    Type column or separate debit/credit columns. Rows that can't be
+    parsed are yielded as None so the caller can count them.
+    """
+    reader = csv.DictReader(_text_stream(stream))
+    columns = _match_columns(reader.fieldnames or [])
+    if 'date' not in columns or not ({'amount', 'debit', 'credit'} & columns.keys()):
+        raise ValueError('CSV needs a date column and an amount or debit/credit columns.')
+
+    def get(row, field):
+        column = columns.get(field)
+        return (row.get(column) or '').strip() if column else ''
+
+    for row in reader:
+        try:
+            if 'amount' in columns:
+                amount = parse_amount(get(row, 'amount'))
+            else:
+                amount = parse_amount(get(row, 'credit') or '0') - parse_amount(get(row, 'debit') or '0')
+
+            kind = get(row, 'type').lower()
+            if kind in ('income', 'credit', 'cr'):
+                is_income = True
+            elif kind in ('expense', 'debit', 'dr'):
+                is_income = False
+            else:
+                is_income = amount > 0
+
+            yield {
+                'date': parse_date(get(row, 'date'), date_format),
+                'description': get(row, 'description')[:256] or None,
+                'amount': abs(amount),
+                'is_income': is_income,
+                'category': get(row, 'category') or None,
+            }
+        except ValueError:
+            yield None
+
+def _ofx_tokens(stream, chunk_size=65536):
+    """Yield (tag, value) pairs from OFX 1.x SGML or 2.x XML, reading in chunks"""
+    stream = _text_stream(stream)
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        parts = (pending + chunk).split('<')
+        pending = parts.pop()
+        for part in parts:
+            if '>' in part:
+                tag, _, value = part.partition('>')
+                yield tag.strip().upper(), value.strip()
+    if '>' in pending:
+        tag, _, value = pending.partition('>')
+        yield tag.strip().upper(), value.strip()
+
+def parse_ofx(stream):
+    """Yield transaction records from the <STMTTRN> blocks of an OFX/QFX statement"""
+    transaction = None
+    for tag, value in _ofx_tokens(stream):
+        if tag == 'STMTTRN':
+            transaction = {}
+        elif tag == '/STMTTRN' and transaction is not None:
+            try:
+                amount = parse_amount(transaction.get('TRNAMT', ''))
+                posted = re.match(r'\d{8}', transaction.get('DTPOSTED', ''))
+                if not posted:
+                    raise ValueError('Missing DTPOSTED')
+                yield {
+                    'date': datetime.strptime(posted.group(0), '%Y%m%d').date(),
+                    'description': (transaction.get('NAME') or transaction.get('MEMO') or '')[:256] or None,
+                    'amount': abs(amount),
+                    'is_income': amount > 0,
+                    'category': None,
+                }
+            except ValueError:
+                yield None
+            transaction = None
+        elif transaction is not None and not tag.startswith('/'):
+            transaction[tag] = value
+
+PARSERS = {
+    'csv': parse_csv,
+    'ofx': parse_ofx,
+}
+
+def detect_format(filename):
+    return 'ofx' if filename and filename.lower().endswith(('.ofx', '.qfx')) else 'csv'
+
+def import_transactions(user_id, records, batch_size=5000, on_chunk=None):
+    """
+    Insert parsed records for a user in batches.
+    Each batch is one executemany INSERT plus its monthly rollup update,
+    committed as one transaction. Category names are matched to the
+    user's categories case-insensitively; unknown names fall back to
+    'Other'. `on_chunk(stats)` is called after every committed batch.
+    """
+    categories = {c.name.lower(): c.id for c in get_user_categories(user_id)}
+    fallback = categories.get('other')
+
+    stats = {'rows': 0, 'skipped': 0, 'chunks': 0, 'seconds': 0.0}
+    batch = []
+
+    def flush():
+        started = time.perf_counter()
+        db.session.bulk_insert_mappings(Expense, batch)
+        apply_summary_deltas(summary_deltas(batch))
+        db.session.commit()
+        elapsed = time.perf_counter() - started
+
+        stats['rows'] += len(batch)
+        stats['chunks'] += 1
+        stats['seconds'] += elapsed
+        chunk = {
+            'chunk': stats['chunks'],
+            'rows': len(batch),
+            'seconds': elapsed,
+            'rows_per_second': len(batch) / elapsed if elapsed else float(len(batch)),
+        }
+        logger.info('Imported chunk %(chunk)d: %(rows)d rows in %(seconds).3fs (%(rows_per_second).0f rows/s)', chunk)
+        if on_chunk:
+            on_chunk(chunk)
+        batch.clear()
+
+    for record in records:
+        if record is None:
+            stats['skipped'] += 1
+            continue
+
+        category = record.get('category')
+        batch.append({
+            'user_id': user_id,
+            'date': record['date'],
+            'description': record.get('description'),
+            'amount': record['amount'],
+            'is_income': record['is_income'],
+            'is_recurring': False,
+            'category_id': categories.get(category.lower(), fallback) if category else fallback,
+        })
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    return stats
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from sqlalchemy import inspect
+from models import db
+from models.expense import Expense
+from models.summary import MonthlySummary
+from utils.timeseries import time_series_query
+from utils.search import apply_search, ensure_search_index
+from utils.pagination import keyset_query
+
+def canonical_queries(user_id):
+    """
+    The hot queries the app runs against the ledger, keyed by a short name.
+    Keep this list in step with the routes and utils that issue them.
+    """
+    end_date = datetime.utcnow().date()
+    start_date = end_date - timedelta(days=180)
+    by_user = Expense.query.filter(Expense.user_id == user_id)
+    cursor = f'{start_date:%Y-%m-%d}.1000000'
+
+    return {
+        'dashboard_recent': by_user.order_by(Expense.date.desc()).limit(5),
+        # First, older and newer pages of the keyset-paginated listing
+        'expenses_page': keyset_query(by_user, per_page=10),
+        'expenses_page_after': keyset_query(by_user, after=cursor, per_page=10),
+        'expenses_page_before': keyset_query(by_user, before=cursor, per_page=10),
+        'expenses_filtered': by_user.filter(
+            Expense.date >= start_date,
+            Expense.date <= end_date,
+            Expense.category_id == 1
+        ).order_by(Expense.date.desc()).limit(10),
+        'reports_range': by_user.filter(
+            Expense.date >= start_date,
+            Expense.date <= end_date
+        ).order_by(Expense.date.desc()),
+        'chart_category_totals': db.session.query(
+            Expense.category_id, db.func.sum(Expense.amount)
+        ).filter(
+            Expense.user_id == user_id,
+            Expense.is_income == False
+        ).group_by(Expense.category_id),
+        'expenses_search': apply_search(by_user, 'amazon', user_id).order_by(Expense.date.desc()).limit(10),
+        'summary_totals': db.session.query(
+            db.func.sum(MonthlySummary.income_total),
+            db.func.sum(MonthlySummary.expense_total)
+        ).filter(MonthlySummary.user_id == user_id),
+        'trend_weekly': time_series_query(user_id, start_date, end_date, 'week'),
+        'trend_monthly': time_series_query(user_id, start_date, end_date, 'month'),
+    }
+
+def _explain(connection, query):
+    """Run the dialect's EXPLAIN for a query and return its plan rows as dicts"""
+    dialect = connection.dialect
+    compiled = query.statement.compile(dialect=dialect)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+    result = connection.exec_driver_sql(prefix + str(compiled), params)
+    return [dict(row._mapping) for row in result]
+
+def _full_scans(dialect_name, plan):
+    """Return a description of every full table scan in a plan"""
+    scans = []
+    for row in plan:
+        if dialect_name == 'sqlite':
+            # e.g. "SCAN expenses" vs "SEARCH expenses USING INDEX ...";
+            # FTS5 tables report a MATCH lookup as "VIRTUAL TABLE INDEX 0:M..."
+            detail = row.get('detail', '')
+            if detail.startswith('SCAN ') and 'USING' not in detail and ':M' not in detail:
+                scans.append(detail)
+        elif dialect_name == 'mysql':
+            if row.get('type') == 'ALL':
+                scans.append(f"full scan of {row.get('table')}")
+    return scans
+
+def explain_canonical_queries(user_id=1):
+    """
+    EXPLAIN every canonical query against the configured database.
+    Returns [(name, plan_rows, full_scans), ...].
+    """
+    report = []
+    with db.engine.connect() as connection:
+        dialect_name = connection.dialect.name
+        for name, query in canonical_queries(user_id).items():
+            plan = _explain(connection, query)
+            report.append((name, plan, _full_scans(dialect_name, plan)))
+    return report
+
+def missing_indexes():
+    """Return declared indexes on the ledger tables that don't exist in the database"""
+    inspector = inspect(db.engine)
+    missing = []
+    for model in (Expense, MonthlySummary):
+        table = model.__table__
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        missing.extend(ix for ix in table.indexes if ix.name not in existing)
+    return missing
+
+def create_missing_indexes():
+    """
+    Create declared indexes that are missing.
+    db.create_all() only builds indexes for new tables, so existing
+    databases need this after the index set changes.
+    """
+    created = []
+    for index in missing_indexes():
+        index.create(bind=db.engine)
+        created.append(index.name)
+    if ensure_search_index():
+        created.append('description search index')
+    return created
@@ -1,66 +1,109 @@
+import os
+import pymysql
 from flask import Flask
-from flask_login import LoginManager
 from models import db
-from models.user import User
-from config import Config
-import os
+from config import config
+from utils.auth import setup_login_manager
+from utils.db_pool import init_pool
+from utils.jobs import init_jobs
+from utils.metrics import init_metrics
+from utils.retention import start_export_sweeper
+from utils.commands import register_commands
+
+pymysql.install_as_MySQLdb()
+
+# Templates and static files live at the project root, not under utils/
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CATEGORIES = [
+    {'name': 'Food', 'color': '#FF5733'},
+    {'name': 'Transportation', 'color': '#33FF57'},
+    {'name': 'Housing', 'color': '#3357FF'},
+    {'name': 'Entertainment', 'color': '#F033FF'},
+    {'name': 'Utilities', 'color': '#FF9033'},
+    {'name': 'Healthcare', 'color': '#33FFF0'},
+    {'name': 'Education', 'color': '#FF33A8'},
+    {'name': 'Shopping', 'color': '#A833FF'},
+    {'name': 'Personal', 'color': '#33A8FF'},
+    {'name': 'Other', 'color': '#AAAAAA'}
+]
+
+def create_app(config_class=None):
+    """
+    Create and configure the Flask application.
+    Nothing here touches the database or loads the charting and PDF
+    stacks; run `flask init-db` once to create the schema.
+    """
+    app = Flask(__name__, root_path=ROOT_PATH)
+    app.config.from_object(config_class or config[os.environ.get('FLASK_CONFIG') or 'default'])
 
-def create_app(config_class=Config):
-    """Create and configure the Flask application"""
-    app = Flask(__name__)
-    app.config.from_object(config_class)
-    
     # Initialize extensions
+    init_pool(app)
     db.init_app(app)
-    
-    # Initialize login manager
-    login_manager = LoginManager()
-    login_manager.init_app(app)
-    login_manager.login_view = 'auth.login'
-    
-    @login_manager.user_loader
-    def load_user(user_id):
-        return User.query.get(int(user_id))
-    
+    setup_login_manager(app)
+
+    # Background jobs (PDF exports) and request metrics
+    init_jobs(app)
+    init_metrics(app)
+
     # Register blueprints
     from routes.auth import auth_bp
     from routes.main import main_bp
     from routes.expenses import expenses_bp
     from routes.reports import reports_bp
-    
+    from routes.api import api_bp
+
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(expenses_bp)
     app.register_blueprint(reports_bp)
-    
-    # Create database tables if they don't exist
-    with app.app_context():
-        db.create_all()
-        
-        # Create default categories if none exist
-        from models.category import Category
-        if Category.query.count() == 0:
-            default_categories = [
-                {'name': 'Food', 'color': '#FF5733'},
-                {'name': 'Transportation', 'color': '#33FF57'},
-                {'name': 'Housing', 'color': '#3357FF'},
-                {'name': 'Entertainment', 'color': '#F033FF'},
-                {'name': 'Utilities', 'color': '#FF9033'},
-                {'name': 'Healthcare', 'color': '#33FFF0'},
-                {'name': 'Education', 'color': '#FF33A8'},
-                {'name': 'Shopping', 'color': '#A833FF'},
-                {'name': 'Personal', 'color': '#33A8FF'},
-                {'name': 'Other', 'color': '#AAAAAA'}
-            ]
-            
-            for cat in default_categories:
-                category = Category(name=cat['name'], color=cat['color'])
-                db.session.add(category)
-            
-            db.session.commit()
-    
+    app.register_blueprint(api_bp)
+
+    register_commands(app)
+
+    # Started by the first request, so it runs in each serving worker and
+    # never in a pre-fork master, CLI command or job process
+    @app.before_first_request
+    def start_background_tasks():
+        start_export_sweeper(app)
+
     # Ensure export directories exist
     os.makedirs(app.config['CSV_FOLDER'], exist_ok=True)
     os.makedirs(app.config['PDF_FOLDER'], exist_ok=True)
-    
+
     return app
+
+def init_db():
+    """
+    Create missing tables, the description search index and the default
+    categories, and upgrade an older rollup table; returns how many
+    categories were added
+    """
+    from models.category import Category
+    from utils.search import ensure_search_index
+    from utils.summary import upgrade_summaries
+
+    db.create_all()
+    ensure_search_index()
+    upgrade_summaries()
+    if Category.query.filter_by(user_id=None).count():
+        return 0
+
+    db.session.bulk_insert_mappings(Category, DEFAULT_CATEGORIES)
+    db.session.commit()
+    return len(DEFAULT_CATEGORIES)
+
+def warm_up():
+    """
+    Import and initialise the charting and PDF stacks ahead of time.
+    Called from a pre-fork master (see gunicorn.conf.py) so workers share
+    the loaded modules and matplotlib's font cache copy-on-write instead
+    of each paying for them on their first report.
+    """
+    import numpy  # noqa: F401
+    import utils.pdf_export  # noqa: F401
+    from utils.renderer import new_figure, render_figure
+
+    fig = new_figure((1, 1))
+    fig.add_subplot(111).plot([0, 1], [0, 1])
+    render_figure(fig)
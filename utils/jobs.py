@@ -0,0 +1,203 @@
+import json
+import time
+import uuid
+import logging
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from flask import has_app_context
+from models import db
+from models.job import Job
+from utils.metrics import JOB_LATENCY
+
+logger = logging.getLogger(__name__)
+
+_app = None
+_executor = None
+_executor_lock = Lock()
+
+# kind -> handler(job, params, progress) returning a result path or None
+JOB_HANDLERS = {}
+
+def job_handler(kind):
+    """Register a function as the handler for a job kind"""
+    def decorator(f):
+        JOB_HANDLERS[kind] = f
+        return f
+    return decorator
+
+def init_jobs(app):
+    """Bind the job subsystem to an application"""
+    global _app
+    _app = app
+
+def _get_app():
+    global _app
+    if _app is None:
+        # Fresh interpreter (spawn start method): load the application
+        from app import app
+        _app = app
+    return _app
+
+def _init_worker():
+    """Process pool initializer: drop DB connections inherited from the parent"""
+    app = _get_app()
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=_get_app().config['JOB_WORKERS'],
+                initializer=_init_worker
+            )
+        return _executor
+
+def _encode(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def submit_job(user_id, kind, **params):
+    """Queue a job and hand it to the pool; returns the Job row"""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+
+    job = Job(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        status='queued',
+        params=json.dumps(params, default=_encode),
+        user_id=user_id
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = _get_app()
+    if app.config['JOB_WORKERS'] > 0:
+        try:
+            _get_executor().submit(run_job, job.id).add_done_callback(_record_timing)
+        except RuntimeError:
+            # Pool is broken or shut down; leave the job queued for `flask run-jobs`
+            logger.exception('Could not submit job %s', job.id)
+    else:
+        _observe(run_job(job.id))
+        db.session.refresh(job)
+
+    return job
+
+def _observe(timing):
+    if timing:
+        kind, status, seconds = timing
+        JOB_LATENCY.observe(seconds, kind, status)
+
+def _record_timing(future):
+    # Pool workers are separate processes, so they report back their timing
+    if not future.cancelled() and future.exception() is None:
+        _observe(future.result())
+
+def _claim(job_id):
+    """Atomically move a job from queued to running; False if someone else has it"""
+    claimed = Job.query.filter_by(id=job_id, status='queued').update({
+        Job.status: 'running',
+        Job.started_at: datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    return bool(claimed)
+
+def _execute(job_id):
+    if not _claim(job_id):
+        return None
+
+    job = Job.query.get(job_id)
+    started = time.perf_counter()
+
+    def progress(percent):
+        job.progress = int(percent)
+        db.session.commit()
+
+    try:
+        handler = JOB_HANDLERS[job.kind]
+        job.result_path = handler(job, job.get_params(), progress)
+        job.status = 'done'
+        job.progress = 100
+    except Exception as e:
+        logger.exception('Job %s failed', job_id)
+        db.session.rollback()
+        job = Job.query.get(job_id)
+        job.status = 'failed'
+        job.error = str(e)[:512]
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    return job.kind, job.status, time.perf_counter() - started
+
+def run_job(job_id):
+    """
+    Run one job; called in a pool process, or inline when JOB_WORKERS is 0.
+    Returns (kind, status, seconds), or None if another worker had it.
+    """
+    if has_app_context():
+        return _execute(job_id)
+    with _get_app().app_context():
+        return _execute(job_id)
+
+def run_pending_jobs(limit=None):
+    """Run queued jobs in this process, oldest first; returns how many ran"""
+    query = db.session.query(Job.id).filter_by(status='queued').order_by(Job.created_at)
+    if limit:
+        query = query.limit(limit)
+    job_ids = [job_id for job_id, in query]
+    for job_id in job_ids:
+        _observe(run_job(job_id))
+    return len(job_ids)
+
+@job_handler('pdf_export')
+def _pdf_export(job, params, progress):
+    from utils.pdf_export import export_to_pdf
+    from utils.db_routing import use_replica, pinned_to_primary
+
+    # A user who wrote just before asking for the report reads from the
+    # primary until their read-your-writes window (primary_until) ends, so
+    # replication lag can't drop their latest transactions from the PDF
+    def read_from_replica():
+        use_replica(not pinned_to_primary(params.get('primary_until', 0)))
+
+    # Progress updates write to the primary, which takes the session off
+    # the replica; the report itself never reads the jobs table, so go back
+    def report(percent):
+        progress(percent)
+        read_from_replica()
+
+    read_from_replica()
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    try:
+        path = export_to_pdf(
+            job.user_id,
+            start_date=date.fromisoformat(start_date) if start_date else None,
+            end_date=date.fromisoformat(end_date) if end_date else None,
+            include_charts=params.get('include_charts', True),
+            progress=report
+        )
+    finally:
+        use_replica(False)
+    if not path:
+        raise ValueError('No transactions in the selected period.')
+    return path
+
+@job_handler('account_deletion')
+def _account_deletion(job, params, progress):
+    from flask import current_app
+    from utils.accounts import delete_account_data
+
+    # The user id is kept in params because the job is detached from the
+    # user before the user row goes
+    delete_account_data(
+        params['account_id'],
+        batch_size=current_app.config['ACCOUNT_DELETION_BATCH_SIZE'],
+        progress=progress,
+        keep_job_id=job.id
+    )
+    return None
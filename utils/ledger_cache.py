@@ -0,0 +1,161 @@
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app
+from models import db
+from models.expense import Expense
+from models.summary import MonthlySummary
+from models.user import User
+
+class UserLedger:
+    """
+    One user's transactions as parallel NumPy arrays.
+    NumPy is imported where it's used, so the cache costs nothing to import
+    while LEDGER_CACHE_ENABLED is off.
+    Holds only what the reports aggregate on: date, amount, category and
+    type. category_id is -1 for uncategorized rows.
+    """
+    def __init__(self, dates, amounts, category_ids, is_income, stamp=None):
+        self.dates = dates
+        self.amounts = amounts
+        self.category_ids = category_ids
+        self.is_income = is_income
+        self.stamp = stamp
+
+    @classmethod
+    def load(cls, user_id, stamp=None, chunk_size=10000):
+        import numpy as np
+
+        rows = db.session.query(
+            Expense.date, Expense.amount, Expense.category_id, Expense.is_income
+        ).filter(
+            Expense.user_id == user_id,
+            Expense.date.isnot(None)
+        ).execution_options(stream_results=True).yield_per(chunk_size)
+
+        dates, amounts, category_ids, is_income = [], [], [], []
+        for day, amount, category_id, income in rows:
+            dates.append(day)
+            amounts.append(amount or 0.0)
+            category_ids.append(-1 if category_id is None else category_id)
+            is_income.append(bool(income))
+
+        return cls(
+            np.array(dates, dtype='datetime64[D]'),
+            np.array(amounts, dtype=np.float64),
+            np.array(category_ids, dtype=np.int64),
+            np.array(is_income, dtype=bool),
+            stamp
+        )
+
+    @property
+    def nbytes(self):
+        return self.dates.nbytes + self.amounts.nbytes + self.category_ids.nbytes + self.is_income.nbytes
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def mask(self, start_date=None, end_date=None, category_ids=None):
+        """Boolean row mask for an optional date range and category list"""
+        import numpy as np
+
+        mask = np.ones(len(self), dtype=bool)
+        if start_date:
+            mask &= self.dates >= np.datetime64(start_date, 'D')
+        if end_date:
+            mask &= self.dates <= np.datetime64(end_date, 'D')
+        if category_ids:
+            mask &= np.isin(self.category_ids, list(category_ids))
+        return mask
+
+    def totals(self, start_date=None, end_date=None, category_ids=None):
+        """Return (total_income, total_expenses)"""
+        mask = self.mask(start_date, end_date, category_ids)
+        amounts = self.amounts[mask]
+        income = self.is_income[mask]
+        return float(amounts[income].sum()), float(amounts[~income].sum())
+
+    def sum_by_category(self, is_income=False, start_date=None, end_date=None):
+        """Return {category_id or None: total} for income or expenses"""
+        import numpy as np
+
+        mask = self.mask(start_date, end_date) & (self.is_income == is_income)
+        ids, inverse = np.unique(self.category_ids[mask], return_inverse=True)
+        totals = np.bincount(inverse, weights=self.amounts[mask], minlength=len(ids))
+        return {
+            (None if category_id == -1 else int(category_id)): float(total)
+            for category_id, total in zip(ids, totals)
+        }
+
+def ledger_stamp(user_id):
+    """
+    Cheap fingerprint of a user's ledger, read from the monthly rollup.
+    Every write path updates the rollup and bumps the user's
+    ledger_version, so a changed stamp means the cached arrays are stale -
+    in this process or any other worker. The version catches writes that
+    leave the timestamp (whole seconds on MySQL), counts and totals as
+    they were, like moving an expense to another category.
+    The first element is the newest rollup update, for Last-Modified.
+    """
+    version = db.session.query(User.ledger_version).filter(User.id == user_id).scalar_subquery()
+    return tuple(db.session.query(
+        db.func.max(MonthlySummary.updated_at),
+        db.func.sum(MonthlySummary.income_count + MonthlySummary.expense_count),
+        db.func.sum(MonthlySummary.income_total),
+        db.func.sum(MonthlySummary.expense_total),
+        version
+    ).filter(MonthlySummary.user_id == user_id).one())
+
+class LedgerCache:
+    """Per-user UserLedger cache with LRU eviction under a total byte budget"""
+    def __init__(self):
+        self._ledgers = OrderedDict()
+        self._lock = Lock()
+        self._nbytes = 0
+
+    def get(self, user_id):
+        stamp = ledger_stamp(user_id)
+        with self._lock:
+            ledger = self._ledgers.get(user_id)
+            if ledger is not None and ledger.stamp == stamp:
+                self._ledgers.move_to_end(user_id)
+                return ledger
+
+        ledger = UserLedger.load(user_id, stamp)
+        self._store(user_id, ledger, current_app.config['LEDGER_CACHE_MAX_BYTES'])
+        return ledger
+
+    def _store(self, user_id, ledger, max_bytes):
+        with self._lock:
+            old = self._ledgers.pop(user_id, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._ledgers[user_id] = ledger
+            self._nbytes += ledger.nbytes
+
+            # Evict least recently used users, but always keep the one just loaded
+            while self._nbytes > max_bytes and len(self._ledgers) > 1:
+                _, evicted = self._ledgers.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+    def invalidate(self, user_id):
+        with self._lock:
+            ledger = self._ledgers.pop(user_id, None)
+            if ledger is not None:
+                self._nbytes -= ledger.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._ledgers.clear()
+            self._nbytes = 0
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+ledger_cache = LedgerCache()
+
+def get_ledger(user_id):
+    """Return the user's cached UserLedger, or None when LEDGER_CACHE_ENABLED is off"""
+    if not current_app.config.get('LEDGER_CACHE_ENABLED'):
+        return None
+    return ledger_cache.get(user_id)
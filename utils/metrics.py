@@ -0,0 +1,215 @@
+import hmac
+import time
+from bisect import bisect_left
+from threading import Lock
+from flask import g, has_request_context, request, Response, abort
+from flask.signals import before_render_template, template_rendered, signals_available
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f'{self.name}{_labels(self.labelnames, labels)} {value}'
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three additions under a lock"""
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def render(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, [("le", bound)])} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {total}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {count}'
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling requests.', ('endpoint', 'method'))
+REQUESTS = Counter(
+    'http_requests_total', 'Requests handled, by response status.', ('endpoint', 'method', 'status'))
+QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds', 'Time spent executing SQL statements.', ('endpoint',), QUERY_BUCKETS)
+QUERIES_PER_REQUEST = Histogram(
+    'db_queries_per_request', 'SQL statements executed per request.', ('endpoint',), COUNT_BUCKETS)
+TEMPLATE_LATENCY = Histogram(
+    'template_render_duration_seconds', 'Time spent rendering Jinja templates.', ('template',))
+CHART_LATENCY = Histogram(
+    'chart_render_duration_seconds', 'Time spent building and rendering charts.', ('chart', 'format'))
+JOB_LATENCY = Histogram(
+    'job_duration_seconds', 'Background job run time, e.g. PDF exports.', ('kind', 'status'))
+
+REGISTRY = [
+    REQUEST_LATENCY, REQUESTS, QUERY_LATENCY, QUERIES_PER_REQUEST,
+    TEMPLATE_LATENCY, CHART_LATENCY, JOB_LATENCY,
+]
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    QUERY_LATENCY.observe(time.perf_counter() - started, _endpoint())
+    if has_request_context():
+        g.metrics_queries = g.get('metrics_queries', 0) + 1
+
+def _handle_error(context):
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+def _before_template(sender, template, context, **extra):
+    g.setdefault('metrics_templates', []).append(time.perf_counter())
+
+def _after_template(sender, template, context, **extra):
+    started = g.get('metrics_templates')
+    if started:
+        TEMPLATE_LATENCY.observe(time.perf_counter() - started.pop(), template.name or 'string')
+
+POOL_METRICS = [
+    ('db_pool_checked_out', 'gauge', 'checked_out', 'Connections currently checked out.'),
+    ('db_pool_checked_in', 'gauge', 'checked_in', 'Idle connections in the pool.'),
+    ('db_pool_overflow', 'gauge', 'overflow', 'Connections open beyond pool_size.'),
+    ('db_pool_checkouts_total', 'counter', 'checkouts', 'Connection checkouts.'),
+    ('db_pool_waits_total', 'counter', 'waits', 'Checkouts that waited for a free connection.'),
+    ('db_pool_wait_seconds_total', 'counter', 'wait_seconds', 'Time spent waiting for connections.'),
+    ('db_pool_timeouts_total', 'counter', 'timeouts', 'Checkouts that timed out.'),
+]
+
+def _pool_lines():
+    from models import db
+    from utils.db_pool import pool_stats
+
+    stats = pool_stats(db.engine)
+    if 'checkouts' not in stats:
+        return
+    for name, kind, key, documentation in POOL_METRICS:
+        yield f'# HELP {name} {documentation}'
+        yield f'# TYPE {name} {kind}'
+        yield f'{name} {stats[key]}'
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(_pool_lines())
+    return '\n'.join(lines) + '\n'
+
+def init_metrics(app):
+    """
+    Time every request, count its SQL statements and template renders, and
+    serve everything at /metrics in the Prometheus text format to scrapers
+    holding METRICS_TOKEN.
+    Metrics are per process; scrape each worker, or put a single worker
+    behind its own port, to get fleet-wide numbers.
+    """
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = 0
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            endpoint = _endpoint()
+            REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint, request.method)
+            REQUESTS.inc(endpoint, request.method, str(response.status_code))
+            QUERIES_PER_REQUEST.observe(g.get('metrics_queries', 0), endpoint)
+        return response
+
+    @app.teardown_request
+    def _record_error(exc):
+        # after_request doesn't run for unhandled exceptions
+        if exc is not None and g.pop('metrics_started', None) is not None:
+            REQUESTS.inc(_endpoint(), request.method, '500')
+
+    if signals_available:
+        before_render_template.connect(_before_template, app)
+        template_rendered.connect(_after_template, app)
+
+    @app.route('/metrics')
+    def metrics():
+        # Includes pool counters, so it's guarded like /internal/pool
+        token = app.config.get('METRICS_TOKEN')
+        supplied = request.headers.get('Authorization', '')
+        if not token or not hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+            abort(404)
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,115 @@
+import time
+from datetime import datetime
+from threading import Lock
+from models import db
+from models.expense import Expense
+
+class KeysetPage:
+    """
+    One page of a (date, id) keyset listing.
+    Mirrors the parts of Flask-SQLAlchemy's Pagination the templates use.
+    """
+    def __init__(self, items, per_page, has_next, has_prev, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.total = total
+
+    @property
+    def next_cursor(self):
+        """Cursor for the next (older) page"""
+        if self.has_next and self.items:
+            return encode_cursor(self.items[-1])
+        return None
+
+    @property
+    def prev_cursor(self):
+        """Cursor for the previous (newer) page"""
+        if self.has_prev and self.items:
+            return encode_cursor(self.items[0])
+        return None
+
+def encode_cursor(expense):
+    """Encode an expense's sort key as 'YYYY-MM-DD.id'"""
+    return f"{expense.date:%Y-%m-%d}.{expense.id}"
+
+def decode_cursor(cursor):
+    """Decode a cursor into (date, id); returns None for missing or malformed input"""
+    if not cursor:
+        return None
+    try:
+        day, expense_id = cursor.split('.', 1)
+        return datetime.strptime(day, '%Y-%m-%d').date(), int(expense_id)
+    except ValueError:
+        return None
+
+def keyset_query(query, after=None, before=None, per_page=10):
+    """
+    The seek query behind one keyset page: rows older than the `after`
+    cursor (or newer than `before`), in scan order, with one extra row to
+    tell whether another page follows.
+    """
+    after = decode_cursor(after)
+    before = decode_cursor(before)
+
+    if before:
+        day, expense_id = before
+        # The redundant date bound lets the index seek to the cursor
+        # instead of walking every row from the far end
+        return query.filter(Expense.date >= day, db.or_(
+            Expense.date > day,
+            db.and_(Expense.date == day, Expense.id > expense_id)
+        )).order_by(Expense.date.asc(), Expense.id.asc()).limit(per_page + 1)
+
+    if after:
+        day, expense_id = after
+        query = query.filter(Expense.date <= day, db.or_(
+            Expense.date < day,
+            db.and_(Expense.date == day, Expense.id < expense_id)
+        ))
+    return query.order_by(Expense.date.desc(), Expense.id.desc()).limit(per_page + 1)
+
+def keyset_paginate(query, after=None, before=None, per_page=10, total=None):
+    """
+    Paginate an Expense query newest-first without OFFSET.
+    `after` seeks to rows older than the cursor, `before` to rows newer
+    than it, so every page is an index range scan of `per_page` rows.
+    """
+    rows = keyset_query(query, after, before, per_page).all()
+
+    if decode_cursor(before):
+        items = list(reversed(rows[:per_page]))
+        return KeysetPage(items, per_page, has_next=True, has_prev=len(rows) > per_page, total=total)
+
+    return KeysetPage(
+        rows[:per_page],
+        per_page,
+        has_next=len(rows) > per_page,
+        has_prev=decode_cursor(after) is not None,
+        total=total
+    )
+
+_count_cache = {}
+_count_lock = Lock()
+
+def cached_count(key, query, ttl=60):
+    """
+    COUNT(*) a query, caching the result in-process for `ttl` seconds.
+    Totals shown next to a listing may lag recent writes by up to `ttl`.
+    """
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    count = query.order_by(None).count()
+
+    with _count_lock:
+        # Drop expired entries so the cache stays bounded by live keys
+        if len(_count_cache) > 1000:
+            for stale in [k for k, (_, expires) in _count_cache.items() if expires <= now]:
+                del _count_cache[stale]
+        _count_cache[key] = (count, now + ttl)
+    return count
@@ -0,0 +1,188 @@
+import os
+import io
+import uuid
+from datetime import datetime
+from flask import current_app
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, Image
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from models import db
+from models.expense import Expense
+from models.category import Category
+from models.user import User
+from utils.charts import submit_expense_pie_chart, submit_monthly_trend_chart
+from utils.export import record_export
+
+class _FlowableStream(list):
+    """
+    Flowables for doc.build that are pulled from an iterator on demand.
+    The layout loop only ever looks at the head of the list and deletes
+    from the front, so keeping a few flowables buffered is enough and the
+    rest of the report never exists in memory at once.
+    """
+    def __init__(self, head, rest, lookahead=3):
+        super().__init__(head)
+        self._rest = iter(rest)
+        self._lookahead = lookahead
+        self._fill()
+
+    def _fill(self):
+        while self._rest is not None and len(self) < self._lookahead:
+            try:
+                self.append(next(self._rest))
+            except StopIteration:
+                self._rest = None
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._fill()
+
+PDF_TABLE_HEADER = ["Date", "Description", "Category", "Amount", "Type"]
+PDF_TABLE_WIDTHS = [1*inch, 2.5*inch, 1.5*inch, 1*inch, 1*inch]
+
+def _ledger_table(data, income_runs):
+    table = LongTable(data, colWidths=PDF_TABLE_WIDTHS, repeatRows=1)
+    style = [
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+        ('ALIGN', (3,1), (3,-1), 'RIGHT'),
+    ]
+    # One command per run of consecutive income rows; expense rows keep the default black
+    for first, last in income_runs:
+        style.append(('TEXTCOLOR', (3, first), (3, last), colors.green))
+    table.setStyle(TableStyle(style))
+    return table
+
+def _ledger_tables(query, chunk_rows):
+    """
+    Yield the transaction ledger as LongTables of at most `chunk_rows` rows.
+    Rows come off a server-side cursor, and each table is laid out on its
+    own, so the cost per row stays constant however long the report is.
+    """
+    data = [PDF_TABLE_HEADER]
+    income_runs = []
+    for day, description, category_name, amount, is_income in query.execution_options(stream_results=True).yield_per(chunk_rows):
+        data.append([
+            day.strftime('%Y-%m-%d'),
+            description or "",
+            category_name or "Uncategorized",
+            f"₹ {amount:.2f}",
+            "Income" if is_income else "Expense"
+        ])
+        row = len(data) - 1
+        if is_income:
+            if income_runs and income_runs[-1][1] == row - 1:
+                income_runs[-1][1] = row
+            else:
+                income_runs.append([row, row])
+
+        if row >= chunk_rows:
+            yield _ledger_table(data, income_runs)
+            data = [PDF_TABLE_HEADER]
+            income_runs = []
+
+    if len(data) > 1:
+        yield _ledger_table(data, income_runs)
+
+def export_to_pdf(user_id, start_date=None, end_date=None, include_charts=True, progress=None):
+    """
+    Build a PDF report and return its path.
+    `progress`, if given, is called with a completion percentage.
+    The ledger is streamed into the document in PDF_TABLE_CHUNK_ROWS
+    sized tables, so peak memory doesn't grow with the number of rows.
+    """
+    if progress is None:
+        progress = lambda percent: None
+
+    user = User.query.get(user_id)
+    if not user:
+        return None
+
+    def filtered(query):
+        query = query.filter(Expense.user_id == user_id)
+        if start_date:
+            query = query.filter(Expense.date >= start_date)
+        if end_date:
+            query = query.filter(Expense.date <= end_date)
+        return query
+
+    total_income, total_expense, count = filtered(db.session.query(
+        db.func.sum(db.case((Expense.is_income == True, Expense.amount), else_=0)),
+        db.func.sum(db.case((Expense.is_income == False, Expense.amount), else_=0)),
+        db.func.count(Expense.id)
+    )).one()
+    if not count:
+        return None
+    total_income = total_income or 0.0
+    total_expense = total_expense or 0.0
+    progress(10)
+
+    os.makedirs(current_app.config['PDF_FOLDER'], exist_ok=True)
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"user_{user_id}_expenses_{timestamp}_{uuid.uuid4().hex[:8]}.pdf"
+    filepath = os.path.join(current_app.config['PDF_FOLDER'], filename)
+
+    doc = SimpleDocTemplate(filepath, pagesize=A4)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    elements.append(Paragraph(f"Financial Report for {user.username}", styles['Heading1']))
+    elements.append(Spacer(1, 0.25 * inch))
+
+    if start_date and end_date:
+        date_text = f"{start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}"
+    elif start_date:
+        date_text = f"From {start_date:%Y-%m-%d}"
+    elif end_date:
+        date_text = f"Until {end_date:%Y-%m-%d}"
+    else:
+        date_text = "All transactions"
+
+    elements.append(Paragraph(date_text, styles['Normal']))
+    elements.append(Spacer(1, 0.25 * inch))
+
+    balance = total_income - total_expense
+
+    summary = Table([
+        ["Total Income", f"₹{total_income:.2f}"],
+        ["Total Expense", f"₹{total_expense:.2f}"],
+        ["Balance", f"₹{balance:.2f}"]
+    ])
+    summary.setStyle(TableStyle([
+        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+        ('TEXTCOLOR', (1,2), (1,2), colors.green if balance >=0 else colors.red)
+    ]))
+    elements.append(summary)
+    elements.append(Spacer(1, 0.5 * inch))
+
+    if include_charts:
+        # Both charts come from the on-disk chart cache; misses render concurrently
+        pie = submit_expense_pie_chart(user_id)
+        trend = submit_monthly_trend_chart(user_id, start_date=start_date, end_date=end_date)
+
+        if pie:
+            elements.append(Image(io.BytesIO(pie.result()), width=5 * inch, height=4 * inch))
+
+        if trend:
+            elements.append(Image(io.BytesIO(trend.result()), width=5 * inch, height=3 * inch))
+        progress(40)
+
+    rows = filtered(db.session.query(
+        Expense.date,
+        Expense.description,
+        Category.name,
+        Expense.amount,
+        Expense.is_income
+    ).select_from(Expense).outerjoin(
+        Category, Expense.category_id == Category.id
+    )).order_by(Expense.date.desc(), Expense.id.desc())
+
+    # No progress updates while the cursor is open: they commit on the same connection
+    progress(60)
+    doc.build(_FlowableStream(elements, _ledger_tables(rows, current_app.config['PDF_TABLE_CHUNK_ROWS'])))
+
+    record_export(user_id, filepath, 'pdf')
+    return filepath
@@ -0,0 +1,149 @@
+import calendar
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models import db
+from models.expense import Expense
+from models.recurring import RecurringMark
+from utils.summary import summary_deltas, apply_summary_deltas
+
+FREQUENCIES = ('daily', 'weekly', 'monthly', 'yearly')
+
+def add_months(day, months):
+    """Shift a date by whole months, clamping to the end of shorter months"""
+    year, month = divmod(day.month - 1 + months, 12)
+    year += day.year
+    month += 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+def occurrence_date(anchor, frequency, n):
+    """
+    Date of the n-th occurrence after a template's own date.
+    Always computed from the anchor, so monthly rent on the 31st lands on
+    the last day of short months without drifting to the 28th.
+    """
+    if frequency == 'daily':
+        return anchor + timedelta(days=n)
+    if frequency == 'weekly':
+        return anchor + timedelta(weeks=n)
+    if frequency == 'monthly':
+        return add_months(anchor, n)
+    if frequency == 'yearly':
+        return add_months(anchor, 12 * n)
+    raise ValueError(f'Unknown recurring frequency: {frequency}')
+
+def reanchor_mark(template, old_date):
+    """
+    Move a template's schedule onto its new date after an edit, without
+    repeating dates that were already materialized: the next occurrence
+    is the first one of the new schedule after the last one generated.
+    Runs in the caller's transaction; the caller commits.
+    """
+    mark = RecurringMark.query.filter_by(template_id=template.id).first()
+    if mark is None or template.date is None or template.recurring_frequency not in FREQUENCIES:
+        return
+
+    frequency = template.recurring_frequency
+    last_date = occurrence_date(old_date, frequency, mark.occurrences) if mark.occurrences else template.date
+    # `occurrences` now counts positions of the new schedule already covered
+    covered = 0
+    while occurrence_date(template.date, frequency, covered + 1) <= last_date:
+        covered += 1
+    mark.occurrences = covered
+    mark.next_date = occurrence_date(template.date, frequency, covered + 1)
+
+def _recurring_templates():
+    return Expense.query.filter(
+        Expense.is_recurring == True,
+        Expense.recurring_frequency.in_(FREQUENCIES),
+        Expense.date.isnot(None)
+    )
+
+def _lock_marks():
+    """
+    Start a transaction that owns the schedule. SQLite has no row locks, so
+    a no-op write takes its database write lock up front and an overlapping
+    run waits here; other databases lock the due marks as they're read.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(RecurringMark.__table__.update().where(db.false()).values(occurrences=0))
+
+def _create_missing_marks():
+    """Start a schedule for every template that doesn't have one yet"""
+    templates = _recurring_templates().outerjoin(
+        RecurringMark, RecurringMark.template_id == Expense.id
+    ).filter(RecurringMark.template_id.is_(None)).order_by(Expense.id).all()
+
+    for template in templates:
+        try:
+            with db.session.begin_nested():
+                db.session.add(RecurringMark(
+                    template_id=template.id,
+                    occurrences=0,
+                    next_date=occurrence_date(template.date, template.recurring_frequency, 1)
+                ))
+        except IntegrityError:
+            # An overlapping run created it first
+            pass
+
+def materialize_recurring(horizon=None, batch_size=5000):
+    """
+    Insert every due occurrence of every recurring template up to `horizon`.
+    Each template's RecurringMark records how many occurrences exist and
+    when the next one is due; it is committed in the same transaction as
+    the rows it covers, so re-running is idempotent. Templates with
+    nothing due are filtered out in SQL, so a run costs roughly the
+    number of new occurrences.
+    Due marks are locked and re-read in transactions of up to `batch_size`
+    templates, so overlapping runs queue instead of inserting the same
+    occurrences twice. Rows are inserted `batch_size` at a time.
+    Returns the number of rows inserted.
+    """
+    horizon = horizon or datetime.utcnow().date()
+
+    _lock_marks()
+    _create_missing_marks()
+    db.session.commit()
+
+    inserted = 0
+    batch = []
+
+    def flush():
+        db.session.bulk_insert_mappings(Expense, batch)
+        apply_summary_deltas(summary_deltas(batch))
+        batch.clear()
+
+    while True:
+        _lock_marks()
+        due = _recurring_templates().with_entities(Expense, RecurringMark).join(
+            RecurringMark, RecurringMark.template_id == Expense.id
+        ).filter(
+            RecurringMark.next_date <= horizon
+        ).order_by(RecurringMark.template_id).limit(batch_size).with_for_update().all()
+
+        if not due:
+            db.session.commit()
+            break
+
+        for template, mark in due:
+            while mark.next_date <= horizon:
+                batch.append({
+                    'user_id': template.user_id,
+                    'category_id': template.category_id,
+                    'amount': template.amount,
+                    'description': template.description,
+                    'date': mark.next_date,
+                    'is_income': template.is_income,
+                    'is_recurring': False,
+                })
+                mark.occurrences += 1
+                mark.next_date = occurrence_date(template.date, template.recurring_frequency, mark.occurrences + 1)
+                inserted += 1
+
+                if len(batch) >= batch_size:
+                    flush()
+
+        # Marks are committed with the rows they cover, releasing their locks
+        flush()
+        db.session.commit()
+
+    return inserted
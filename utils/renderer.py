@@ -0,0 +1,68 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from flask import current_app, has_app_context
+from utils.metrics import CHART_LATENCY
+
+_executor = None
+_executor_lock = Lock()
+
+def _reset_after_fork():
+    # A forked child (e.g. a job worker) inherits the pool object but not its threads
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def new_figure(figsize):
+    """
+    Create a standalone Figure with its own Agg canvas.
+    Nothing goes through pyplot's global state, so figures can be built
+    and rendered on any thread.
+    """
+    # matplotlib is only loaded once a chart is actually drawn
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+def render_figure(fig, fmt='png'):
+    """Render a figure to an in-memory PNG or SVG and return the bytes"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+def build_and_render(build, args, fmt='png'):
+    """Build a figure with build(*args) and render it on the calling thread, timing both"""
+    with CHART_LATENCY.time(build.__name__, fmt):
+        return render_figure(build(*args), fmt)
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = 2
+            if has_app_context():
+                workers = current_app.config.get('CHART_RENDER_WORKERS', workers)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chart-render')
+        return _executor
+
+def submit(fn, *args):
+    """Run an arbitrary rendering task on the bounded render pool"""
+    return _get_executor().submit(fn, *args)
+
+def submit_render(build, *args, fmt='png'):
+    """
+    Build and render a figure on the bounded render pool.
+    `build(*args)` must return a Figure made with new_figure().
+    Returns a Future resolving to the image bytes.
+    """
+    return submit(build_and_render, build, args, fmt)
+
+def render(build, *args, fmt='png'):
+    """Build and render a figure on the render pool and wait for the bytes"""
+    return submit_render(build, *args, fmt=fmt).result()
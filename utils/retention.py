@@ -0,0 +1,112 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from models import db
+from models.export import Export
+from utils.export import export_folder
+
+logger = logging.getLogger(__name__)
+
+def _remove(export):
+    try:
+        os.remove(os.path.join(export_folder(export.file_type), export.filename))
+    except FileNotFoundError:
+        pass
+    db.session.delete(export)
+
+def delete_user_exports(user_id, limit=None):
+    """
+    Remove a user's export files and manifest entries, at most `limit` of
+    them; returns how many were removed. The caller commits.
+    """
+    exports = Export.query.filter_by(user_id=user_id).order_by(Export.id)
+    if limit:
+        exports = exports.limit(limit)
+    removed = 0
+    for export in exports.all():
+        _remove(export)
+        removed += 1
+    return removed
+
+def sweep_exports(max_age_days=30, max_bytes_per_user=None, scan_orphans=False, batch_size=500):
+    """
+    Apply the export retention policy and return the number of files removed.
+    - Exports older than `max_age_days` are deleted.
+    - Users over `max_bytes_per_user` lose their oldest exports until they fit.
+    - With `scan_orphans`, files older than the cutoff that aren't in the
+      manifest (e.g. written before it existed) are removed too. That walks
+      the whole folders, so it's meant for the CLI rather than every sweep.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    removed = 0
+
+    # Expired exports, in bounded batches
+    while True:
+        expired = Export.query.filter(Export.created_at < cutoff).limit(batch_size).all()
+        if not expired:
+            break
+        for export in expired:
+            _remove(export)
+        db.session.commit()
+        removed += len(expired)
+
+    # Per-user size quotas
+    if max_bytes_per_user:
+        over_quota = db.session.query(Export.user_id).group_by(Export.user_id).having(
+            db.func.sum(Export.size) > max_bytes_per_user
+        ).all()
+        for user_id, in over_quota:
+            kept = 0
+            for export in Export.query.filter_by(user_id=user_id).order_by(Export.created_at.desc()):
+                kept += export.size or 0
+                if kept > max_bytes_per_user:
+                    _remove(export)
+                    removed += 1
+            db.session.commit()
+
+    if scan_orphans:
+        known = None
+        for file_type in ('csv', 'pdf'):
+            folder = export_folder(file_type)
+            if not os.path.isdir(folder):
+                continue
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if not entry.is_file() or datetime.utcfromtimestamp(entry.stat().st_mtime) >= cutoff:
+                        continue
+                    if known is None:
+                        known = {filename for filename, in db.session.query(Export.filename)}
+                    if entry.name not in known:
+                        os.remove(entry.path)
+                        removed += 1
+
+    return removed
+
+def start_export_sweeper(app):
+    """
+    Run sweep_exports every EXPORT_SWEEP_INTERVAL seconds on a daemon thread.
+    Each worker process runs its own sweeper; sweeps are idempotent.
+    """
+    interval = app.config.get('EXPORT_SWEEP_INTERVAL')
+    if not interval:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                with app.app_context():
+                    removed = sweep_exports(
+                        app.config['EXPORT_RETENTION_DAYS'],
+                        app.config['EXPORT_QUOTA_BYTES_PER_USER']
+                    )
+                    if removed:
+                        logger.info('Export sweeper removed %d files', removed)
+            except Exception:
+                logger.exception('Export sweep failed')
+
+    thread = threading.Thread(target=run, name='export-sweeper', daemon=True)
+    thread.start()
+    return thread
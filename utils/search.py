@@ -0,0 +1,121 @@
+import re
+from sqlalchemy import inspect
+from models import db
+from models.expense import Expense
+
+# SQLite keeps descriptions in an external-content FTS5 table kept in sync
+# by triggers; MySQL uses a FULLTEXT index on the column itself.
+# The FTS table also indexes user_id as a token, so a search only ever
+# walks the searching user's matches rather than every user's.
+FTS_TABLE = 'expenses_fts'
+FTS_COLUMNS = ('description', 'user_id')
+FULLTEXT_INDEX = 'ix_expenses_description_ft'
+
+SQLITE_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"description, user_id, content='expenses', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON expenses BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, description, user_id) VALUES (new.id, new.description, new.user_id); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON expenses BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, user_id) "
+    f"VALUES ('delete', old.id, old.description, old.user_id); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF description, user_id ON expenses BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, user_id) "
+    f"VALUES ('delete', old.id, old.description, old.user_id); "
+    f"INSERT INTO {FTS_TABLE}(rowid, description, user_id) VALUES (new.id, new.description, new.user_id); END",
+]
+
+SQLITE_DROP_DDL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+# Engines known to have the text index, so searches skip the check
+_indexed_engines = set()
+
+def search_terms(text):
+    """Split user input into plain word tokens; search syntax is never passed through"""
+    return re.findall(r'\w+', text or '')[:10]
+
+def ensure_search_index(rebuild=False):
+    """
+    Create the description search index if it's missing and return True
+    if it was created. A new SQLite index (or rebuild=True) is filled from
+    the existing rows; MySQL builds FULLTEXT indexes as part of the DDL.
+    """
+    engine = db.engine
+    dialect_name = engine.dialect.name
+    created = False
+
+    with engine.begin() as connection:
+        if dialect_name == 'sqlite':
+            inspector = inspect(connection)
+            if inspector.has_table(FTS_TABLE):
+                # Tables from before user_id was indexed are rebuilt with it
+                columns = tuple(column['name'] for column in inspector.get_columns(FTS_TABLE))
+                if columns != FTS_COLUMNS:
+                    for statement in SQLITE_DROP_DDL:
+                        connection.exec_driver_sql(statement)
+            created = not inspect(connection).has_table(FTS_TABLE)
+            for statement in SQLITE_SEARCH_DDL:
+                connection.exec_driver_sql(statement)
+            if created or rebuild:
+                connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif dialect_name == 'mysql':
+            existing = {index['name'] for index in inspect(connection).get_indexes('expenses')}
+            if FULLTEXT_INDEX not in existing:
+                connection.exec_driver_sql(
+                    f'CREATE FULLTEXT INDEX {FULLTEXT_INDEX} ON expenses (description)'
+                )
+                created = True
+
+    _indexed_engines.discard(engine.url)
+    return created
+
+def _has_search_index(engine):
+    """Whether the text index exists; databases where init-db hasn't run since upgrading lack it"""
+    if engine.url in _indexed_engines:
+        return True
+    if engine.dialect.name == 'sqlite':
+        found = inspect(engine).has_table(FTS_TABLE)
+    elif engine.dialect.name == 'mysql':
+        found = FULLTEXT_INDEX in {index['name'] for index in inspect(engine).get_indexes('expenses')}
+    else:
+        found = False
+    if found:
+        _indexed_engines.add(engine.url)
+    return found
+
+def apply_search(query, text, user_id):
+    """
+    Restrict a user's Expense query to rows whose description contains
+    every word in `text`, each matched as a prefix ("amaz" finds "Amazon").
+    The match runs against the text index, so the rest of the query -
+    date and category filters and keyset ordering - is unchanged.
+    Without an index (other backends, or one not created yet) it falls
+    back to LIKE filters.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return query
+
+    engine = db.engine
+    if _has_search_index(engine):
+        if engine.dialect.name == 'sqlite':
+            # Scoped by the user_id token, so the subquery only holds this user's matches
+            words = ' AND '.join(f'"{term}"*' for term in terms)
+            match = f'user_id : "{int(user_id)}" AND description : ({words})'
+            matching_ids = db.select(db.literal_column('rowid')).select_from(
+                db.table(FTS_TABLE)
+            ).where(db.text(f'{FTS_TABLE} MATCH :match').bindparams(match=match))
+            return query.filter(Expense.id.in_(matching_ids))
+
+        if engine.dialect.name == 'mysql':
+            # Boolean mode: every term required, prefix matched
+            return query.filter(Expense.description.match(' '.join(f'+{term}*' for term in terms)))
+
+    for term in terms:
+        query = query.filter(Expense.description.ilike(f'%{term}%'))
+    return query
@@ -0,0 +1,244 @@
+from datetime import datetime
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import db
+from models.expense import Expense
+from models.summary import MonthlySummary, UNCATEGORIZED
+from models.user import User
+
+def month_start(value):
+    """Return the first day of the month for a date, datetime or 'YYYY-MM-DD' string"""
+    if isinstance(value, str):
+        value = datetime.strptime(value[:10], '%Y-%m-%d').date()
+    elif isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+def _delta_for(user_id, day, category_id, is_income, amount, count, deltas):
+    """Accumulate one change into a {(user_id, month, category_id): [inc, exp, inc_n, exp_n]} dict"""
+    key = (user_id, month_start(day), UNCATEGORIZED if category_id is None else category_id)
+    totals = deltas.setdefault(key, [0.0, 0.0, 0, 0])
+    if is_income:
+        totals[0] += amount
+        totals[2] += count
+    else:
+        totals[1] += amount
+        totals[3] += count
+    return deltas
+
+def summary_deltas(expenses, sign=1, deltas=None):
+    """
+    Build summary deltas for a batch of expenses.
+    Accepts Expense objects or mappings with the same field names.
+    """
+    if deltas is None:
+        deltas = {}
+    for e in expenses:
+        get = e.get if isinstance(e, dict) else lambda name: getattr(e, name)
+        _delta_for(
+            get('user_id'),
+            get('date'),
+            get('category_id'),
+            bool(get('is_income')),
+            sign * float(get('amount') or 0),
+            sign,
+            deltas
+        )
+    return deltas
+
+def _upsert_statement(dialect_name, row):
+    """
+    INSERT the delta as a new rollup row, or add it to the existing row,
+    in one statement. Returns None where the dialect has no upsert.
+    """
+    table = MonthlySummary.__table__
+    if dialect_name == 'mysql':
+        stmt = mysql_insert(table).values(**row)
+        return stmt.on_duplicate_key_update(
+            income_total=table.c.income_total + stmt.inserted.income_total,
+            expense_total=table.c.expense_total + stmt.inserted.expense_total,
+            income_count=table.c.income_count + stmt.inserted.income_count,
+            expense_count=table.c.expense_count + stmt.inserted.expense_count,
+            updated_at=stmt.inserted.updated_at
+        )
+    if dialect_name in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect_name == 'sqlite' else postgresql_insert
+        stmt = insert(table).values(**row)
+        return stmt.on_conflict_do_update(
+            index_elements=['user_id', 'month', 'category_id'],
+            set_={
+                'income_total': table.c.income_total + stmt.excluded.income_total,
+                'expense_total': table.c.expense_total + stmt.excluded.expense_total,
+                'income_count': table.c.income_count + stmt.excluded.income_count,
+                'expense_count': table.c.expense_count + stmt.excluded.expense_count,
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+    return None
+
+def _update_or_insert(row):
+    """Portable fallback: relative UPDATE, else INSERT in a savepoint, retrying the UPDATE if a concurrent writer got there first"""
+    query = MonthlySummary.query.filter_by(
+        user_id=row['user_id'], month=row['month'], category_id=row['category_id']
+    )
+    values = {
+        MonthlySummary.income_total: MonthlySummary.income_total + row['income_total'],
+        MonthlySummary.expense_total: MonthlySummary.expense_total + row['expense_total'],
+        MonthlySummary.income_count: MonthlySummary.income_count + row['income_count'],
+        MonthlySummary.expense_count: MonthlySummary.expense_count + row['expense_count'],
+        MonthlySummary.updated_at: row['updated_at']
+    }
+    if query.update(values, synchronize_session=False):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(MonthlySummary.__table__.insert().values(**row))
+    except IntegrityError:
+        query.update(values, synchronize_session=False)
+
+def bump_ledger_versions(user_ids=None):
+    """
+    Advance the ledger version of some users (or everyone) in the current
+    transaction. It changes on every rollup write, so ledger_stamp() moves
+    even when timestamps, counts and totals all come out the same.
+    """
+    query = User.query
+    if user_ids is not None:
+        query = query.filter(User.id.in_(user_ids))
+    query.update({User.ledger_version: User.ledger_version + 1}, synchronize_session=False)
+
+def apply_summary_deltas(deltas):
+    """
+    Apply deltas to the rollup table in the current transaction.
+    Each delta is an upsert that adds to the existing row, so concurrent
+    writers neither overwrite each other nor race to insert the same
+    (user, month, category) row.
+    The caller is responsible for committing.
+    """
+    now = datetime.utcnow()
+    dialect_name = db.engine.dialect.name
+    for (user_id, month, category_id), (inc, exp, inc_n, exp_n) in deltas.items():
+        row = {
+            'user_id': user_id,
+            'month': month,
+            'category_id': category_id,
+            'income_total': inc,
+            'expense_total': exp,
+            'income_count': inc_n,
+            'expense_count': exp_n,
+            'updated_at': now
+        }
+        stmt = _upsert_statement(dialect_name, row)
+        if stmt is None:
+            _update_or_insert(row)
+        else:
+            db.session.execute(stmt)
+
+    user_ids = {user_id for user_id, _, _ in deltas}
+    if user_ids:
+        bump_ledger_versions(user_ids)
+
+def add_to_summary(expense):
+    """Record a new (or updated) expense in the rollup"""
+    apply_summary_deltas(summary_deltas([expense]))
+
+def remove_from_summary(expense):
+    """Take an expense's current values out of the rollup"""
+    apply_summary_deltas(summary_deltas([expense], sign=-1))
+
+def rebuild_monthly_summaries(user_id=None):
+    """
+    Recompute the rollup from the raw ledger, for one user or everyone.
+    Expenses are grouped by day in SQL and folded into months in Python,
+    which keeps the query portable between MySQL and SQLite.
+    """
+    summaries = MonthlySummary.query
+    expenses = db.session.query(
+        Expense.user_id,
+        Expense.date,
+        Expense.category_id,
+        Expense.is_income,
+        db.func.sum(Expense.amount),
+        db.func.count(Expense.id)
+    )
+    if user_id is not None:
+        summaries = summaries.filter_by(user_id=user_id)
+        expenses = expenses.filter(Expense.user_id == user_id)
+    expenses = expenses.filter(Expense.user_id.isnot(None), Expense.date.isnot(None))
+
+    summaries.delete(synchronize_session=False)
+
+    deltas = {}
+    grouped = expenses.group_by(
+        Expense.user_id, Expense.date, Expense.category_id, Expense.is_income
+    )
+    for uid, day, category_id, is_income, total, count in grouped:
+        _delta_for(uid, day, category_id, bool(is_income), total or 0, count, deltas)
+
+    now = datetime.utcnow()
+    db.session.bulk_insert_mappings(MonthlySummary, [
+        {
+            'user_id': uid,
+            'month': month,
+            'category_id': category_id,
+            'income_total': inc,
+            'expense_total': exp,
+            'income_count': inc_n,
+            'expense_count': exp_n,
+            'updated_at': now
+        }
+        for (uid, month, category_id), (inc, exp, inc_n, exp_n) in deltas.items()
+    ])
+    bump_ledger_versions(None if user_id is None else [user_id])
+    db.session.commit()
+    return len(deltas)
+
+def summary_totals(user_id):
+    """Return (total_income, total_expenses) for a user from the rollup"""
+    income, expenses = db.session.query(
+        db.func.sum(MonthlySummary.income_total),
+        db.func.sum(MonthlySummary.expense_total)
+    ).filter(MonthlySummary.user_id == user_id).one()
+    return income or 0, expenses or 0
+
+def summary_count(user_id, category_id=None):
+    """Return the number of transactions a user has, optionally in one category"""
+    query = db.session.query(
+        db.func.sum(MonthlySummary.income_count + MonthlySummary.expense_count)
+    ).filter(MonthlySummary.user_id == user_id)
+    if category_id:
+        query = query.filter(MonthlySummary.category_id == category_id)
+    return query.scalar() or 0
+
+def upgrade_summaries():
+    """
+    Bring a rollup from an older version up to date: add the users'
+    ledger_version counter, drop the old foreign key on category_id
+    (MySQL enforces it, and the UNCATEGORIZED sentinel 0 isn't a
+    category) and, if any NULL-category rows are left, rebuild the rollup
+    to merge them.
+    Returns True if the rollup was rebuilt.
+    """
+    engine = db.engine
+    user_columns = {column['name'] for column in inspect(engine).get_columns(User.__tablename__)}
+    if 'ledger_version' not in user_columns:
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"ALTER TABLE {User.__tablename__} ADD COLUMN ledger_version INTEGER NOT NULL DEFAULT 0"
+            )
+
+    if engine.dialect.name == 'mysql':
+        for fk in inspect(engine).get_foreign_keys(MonthlySummary.__tablename__):
+            if fk['constrained_columns'] == ['category_id'] and fk.get('name'):
+                with engine.begin() as connection:
+                    connection.exec_driver_sql(
+                        f"ALTER TABLE {MonthlySummary.__tablename__} DROP FOREIGN KEY {fk['name']}"
+                    )
+
+    if MonthlySummary.query.filter(MonthlySummary.category_id.is_(None)).first() is None:
+        return False
+    rebuild_monthly_summaries()
+    return True
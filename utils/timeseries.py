@@ -0,0 +1,201 @@
+from datetime import date, datetime, timedelta
+from models import db
+from models.expense import Expense
+from models.summary import MonthlySummary
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+
+# Upper bound on points per series, so a daily series over decades
+# can't be requested by accident
+MAX_POINTS = 1000
+
+class TimeSeries:
+    """
+    Income and expense totals per bucket as parallel lists, oldest first.
+    Every bucket between start and end is present; empty ones are zero.
+    """
+    __slots__ = ('granularity', 'starts', 'income', 'expense')
+
+    def __init__(self, granularity, starts, income, expense):
+        self.granularity = granularity
+        self.starts = starts
+        self.income = income
+        self.expense = expense
+
+    @property
+    def labels(self):
+        return [bucket_label(start, self.granularity) for start in self.starts]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        """Yield (label, income, expense) rows, the shape the chart builders take"""
+        return iter(zip(self.labels, self.income, self.expense))
+
+    def is_empty(self):
+        return not any(self.income) and not any(self.expense)
+
+    def to_dict(self):
+        return {
+            'granularity': self.granularity,
+            'labels': self.labels,
+            'income': self.income,
+            'expense': self.expense,
+        }
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+def bucket_start(value, granularity):
+    """First day of the bucket containing a date; weeks start on Monday"""
+    value = _as_date(value)
+    if granularity == 'day':
+        return value
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    if granularity == 'quarter':
+        return value.replace(month=(value.month - 1) // 3 * 3 + 1, day=1)
+    if granularity == 'year':
+        return value.replace(month=1, day=1)
+    raise ValueError(f'Unknown granularity: {granularity}')
+
+def shift_bucket(start, granularity, count=1):
+    """Move a bucket start forward (or back, with a negative count) by whole buckets"""
+    if granularity == 'day':
+        return start + timedelta(days=count)
+    if granularity == 'week':
+        return start + timedelta(weeks=count)
+    months = {'month': 1, 'quarter': 3, 'year': 12}[granularity] * count
+    index = start.year * 12 + start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def bucket_label(start, granularity):
+    if granularity in ('day', 'week'):
+        return start.strftime('%Y-%m-%d')
+    if granularity == 'month':
+        return start.strftime('%Y-%m')
+    if granularity == 'quarter':
+        return f'{start.year}-Q{(start.month - 1) // 3 + 1}'
+    return str(start.year)
+
+def bucket_starts(start_date, end_date, granularity):
+    """Every bucket start from the bucket holding start_date through the one holding end_date"""
+    current = bucket_start(start_date, granularity)
+    last = bucket_start(end_date, granularity)
+    starts = []
+    while current <= last:
+        starts.append(current)
+        if len(starts) > MAX_POINTS:
+            raise ValueError(f'More than {MAX_POINTS} {granularity} buckets requested')
+        current = shift_bucket(current, granularity)
+    return starts
+
+def recent_range(granularity='month', periods=6, today=None):
+    """(start_date, end_date) covering the last `periods` buckets, including the current one"""
+    end_date = today or date.today()
+    return shift_bucket(bucket_start(end_date, granularity), granularity, 1 - periods), end_date
+
+def auto_granularity(start_date, end_date, max_points=60):
+    """The finest granularity that keeps the range within max_points buckets"""
+    days = (_as_date(end_date) - _as_date(start_date)).days + 1
+    for granularity, approx_days in (('day', 1), ('week', 7), ('month', 30.4), ('quarter', 91.3)):
+        if days / approx_days <= max_points:
+            return granularity
+    return 'year'
+
+def bucket_expression(column, granularity, dialect_name):
+    """SQL expression for the first day of a date column's bucket"""
+    if dialect_name == 'sqlite':
+        if granularity == 'day':
+            return db.func.date(column)
+        if granularity == 'week':
+            # Forward to Sunday (or stay on it), then back to that week's Monday
+            return db.func.date(column, 'weekday 0', '-6 days')
+        if granularity == 'month':
+            return db.func.strftime('%Y-%m-01', column)
+        if granularity == 'quarter':
+            quarter_month = (db.cast(db.func.strftime('%m', column), db.Integer) - 1) / 3 * 3 + 1
+            return db.func.printf('%s-%02d-01', db.func.strftime('%Y', column), quarter_month)
+        if granularity == 'year':
+            return db.func.strftime('%Y-01-01', column)
+    elif dialect_name == 'mysql':
+        if granularity == 'day':
+            return db.func.date(column)
+        if granularity == 'week':
+            return db.func.subdate(column, db.func.weekday(column))
+        if granularity == 'month':
+            return db.func.date_format(column, '%Y-%m-01')
+        if granularity == 'quarter':
+            quarter_month = (db.func.quarter(column) - 1) * 3 + 1
+            return db.func.concat(db.func.year(column), '-', db.func.lpad(quarter_month, 2, '0'), '-01')
+        if granularity == 'year':
+            return db.func.date_format(column, '%Y-01-01')
+    elif granularity in GRANULARITIES:
+        # PostgreSQL and others with date_trunc
+        return db.func.date_trunc(granularity, column)
+    raise ValueError(f'Unknown granularity: {granularity}')
+
+def time_series_query(user_id, start_date, end_date, granularity='month', category_ids=None):
+    """
+    Query for (bucket start, income, expense) rows with activity.
+    Months and coarser read the monthly rollup, so even multi-year series
+    touch a few rows per month; days and weeks group the ledger itself.
+    """
+    dialect_name = db.engine.dialect.name
+
+    if granularity in ('day', 'week'):
+        bucket = bucket_expression(Expense.date, granularity, dialect_name).label('bucket')
+        query = db.session.query(
+            bucket,
+            db.func.sum(db.case((Expense.is_income == True, Expense.amount), else_=0)),
+            db.func.sum(db.case((Expense.is_income == False, Expense.amount), else_=0))
+        ).filter(
+            Expense.user_id == user_id,
+            Expense.date >= start_date,
+            Expense.date <= end_date
+        )
+        if category_ids:
+            query = query.filter(Expense.category_id.in_(category_ids))
+    else:
+        # The rollup holds whole months, so the range widens to month edges
+        bucket = bucket_expression(MonthlySummary.month, granularity, dialect_name).label('bucket')
+        query = db.session.query(
+            bucket,
+            db.func.sum(MonthlySummary.income_total),
+            db.func.sum(MonthlySummary.expense_total)
+        ).filter(
+            MonthlySummary.user_id == user_id,
+            MonthlySummary.month >= bucket_start(start_date, 'month'),
+            MonthlySummary.month <= end_date
+        )
+        if category_ids:
+            query = query.filter(MonthlySummary.category_id.in_(category_ids))
+
+    # Group by the alias so MySQL doesn't compare two copies of the bound expression
+    return query.group_by(db.literal_column('bucket'))
+
+def time_series(user_id, start_date, end_date, granularity='month', category_ids=None):
+    """
+    Bucket a user's income and expenses between two dates (inclusive) in
+    the database and return a gap-filled TimeSeries.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Unknown granularity: {granularity}')
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    starts = bucket_starts(start_date, end_date, granularity)
+    rows = time_series_query(user_id, start_date, end_date, granularity, category_ids).all()
+
+    totals = {_as_date(start): (income or 0.0, expense or 0.0) for start, income, expense in rows}
+    income, expense = [], []
+    for start in starts:
+        inc, exp = totals.get(start, (0.0, 0.0))
+        income.append(round(float(inc), 2))
+        expense.append(round(float(exp), 2))
+    return TimeSeries(granularity, starts, income, expense)